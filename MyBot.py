@@ -5,6 +5,8 @@ import random
 import logging
 import heapq
 import time
+import os
+import json
 from math import sqrt
 
 
@@ -12,14 +14,19 @@ from hlt.hlt_networking import Game
 from hlt import hlt_constants as constants
 from hlt.hlt_positionals import Direction, Position
 from hlt.hlt_entity import Dropoff
+from hlt.hlt_command_builder import CommandBuilder
+from hlt.hlt_profiling import timed
 
 
 random.seed(0)
 
-FULL = 700
-EMPTY = 50
-TIME_TO_HALITE_RATIO = 0.5
-MIN_DISTANCE = 4
+# Tuning constants, overridden by the tournament runner through BOT_SETTINGS (a global in-process, an
+# environment variable holding JSON otherwise)
+SETTINGS = globals().get("BOT_SETTINGS") or json.loads(os.environ.get("BOT_SETTINGS", "{}"))
+FULL = SETTINGS.get("FULL", 700)
+EMPTY = SETTINGS.get("EMPTY", 50)
+TIME_TO_HALITE_RATIO = SETTINGS.get("TIME_TO_HALITE_RATIO", 0.5)
+MIN_DISTANCE = SETTINGS.get("MIN_DISTANCE", 4)
 
 
 def get_ships(game):
@@ -65,96 +72,35 @@ def get_enemy_ships(game):
         game object -- Halite game object
     
     Returns:
-        list Ships -- list containing ennemy ships
+        tuple Ships -- tuple containing ennemy ships
     """
-    s = []
-    for i, p in game.players.items():
-        if i != game.my_id:
-            for ship in p.get_ships():
-                s.append(ship)
-    return s
+    return game.enemy_ships()
 
 
-def closest_dropoff(ship, game):
-    """ return the closest drop
-    
-    Arguments:
-        ship object -- Halite game object
-        game object -- Halite game object
-    
-    Returns:
-        [distance, structure object] -- structure, either shipyard or dropoff
-    """
-
-    dropoffs = get_position_dropoff(game)
-
-    closest_dropoff = [1000, None]
-
-    for dropoff in dropoffs:
-
-        distance = game.game_map.calculate_distance(ship.position, dropoff.position)
-
-        if distance < closest_dropoff[0]:
-
-            closest_dropoff = dropoff
-
-    return closest_dropoff
-
 def go_dropoff(ship, game, commands, map_game):
-    """ command method getting the closest shipyard or dropoff and get the mouvement to ge to it
+    """ command method taking a move toward the closest shipyard or dropoff from the return field,
+    stepping around with get_movement when every such move leads to a reserved or occupied cell
     
     Arguments:
         ship object -- Halite game object
         game object -- Halite game object
-        commands list of string -- commands to the agents
+        commands CommandBuilder -- commands to the agents
         map_game Map -- custom map object
     
     Returns:
-        move order -- move order given to the ship with a direction
+        move tuple -- (ship, direction, destination) recorded in commands
     """
 
-    target = closest_dropoff(ship, game)
-
-    if not target[1]:
-
-        target = get_position_shipyard(game)
-    
-    else: 
-
-        target = target[1].position
+    # Horizontal moves first: ships leave the shipyard along its row, and return along its column
+    for movement in sorted(game.return_field.moves(ship.position), key=lambda direction: direction[0] == 0):
+        destination = ship.position.directional_offset(movement)
+        if not commands.is_reserved(destination) and not game.game_map.occupancy.is_occupied(destination):
+            return commands.move(ship, movement)
 
+    target = game.return_field.nearest_structure(ship.position).position
     movement = get_movement(ship.position, target, map_game, commands)
 
-    return ship.move(movement)
-
-
-def get_deplacement_cost(position1, position2):
-
-    max_x, min_x = max(position1.x, position2.x), min (position1.x, position2.x)
-    max_y, min_y = max(position1.y, position2.y), min (position1.y, position2.y)
-
-    total_cost = 0
-
-    actual_position = Position(min_x , min_y)
-
-    for y in range(0, max_y - min_y):
-
-        next_deplacement = Position(actual_position.x, actual_position.y + y)
-
-        total_cost += game.game_map.calculate_distance(actual_position, next_deplacement)
-
-        actual_position = next_deplacement
-
-    for x in range(0, max_x - min_x):
-    
-        next_deplacement = Position(actual_position.x + x, actual_position.y)
-
-        total_cost += game.game_map.calculate_distance(actual_position, next_deplacement)
-
-        actual_position = next_deplacement
-
-    return total_cost
-
+    return commands.move(ship, movement)
 
 
 def look_best_cell(ship, game, range_look, avoid_cells):
@@ -164,30 +110,21 @@ def look_best_cell(ship, game, range_look, avoid_cells):
         ship object -- Halite game object
         game object -- Halite game object
         range_look int -- radius
+        avoid_cells list of cell -- cells already targeted
     
     Returns:
         cell object -- the cell object wit hthe highest amount of halite
     """
-    maximum_halite = 0
-    target = None
+    claimed = [cell.position for cell in avoid_cells]
+    claimed.append(get_position_shipyard(game))
 
-    for x in range(1,range_look):
+    best = game.game_map.halite_index.best_within(ship.position, range_look, 1, claimed)
 
-        for y in range(1,range_look):
-    
-            cell_pos_x = ship.position.x + x
-            cell_pos_y = ship.position.y + y
-
-            if game.game_map[Position(cell_pos_x, cell_pos_y)].halite_amount > maximum_halite and Position(cell_pos_x, cell_pos_y) != get_position_shipyard(game):
+    if not best or best[0][1] <= 0:
 
-                if game.game_map[Position(cell_pos_x, cell_pos_y)] not in avoid_cells:
-
-                    if get_deplacement_cost(ship.position, Position(cell_pos_x, cell_pos_y)) - 250 <  game.game_map[Position(cell_pos_x, cell_pos_y)].halite_amount:
-    
-                        maximum_halite = game.game_map[Position(cell_pos_x, cell_pos_y)].halite_amount 
-                        target = game.game_map[Position(cell_pos_x, cell_pos_y)]
+        return None
 
-    return target
+    return game.game_map[best[0][0]]
 
     
 
@@ -197,16 +134,16 @@ def go_target(agent, game, commands, map_game):
     Arguments:
         game object -- Halite game object
         ship object -- Halite game object
-        commands list of string -- commands given to the ships
+        commands CommandBuilder -- commands given to the ships
         map_game Map custom object
     
     Returns:
-        move order -- move order given to the ship with a direction
+        move tuple -- (ship, direction, destination) recorded in commands
     """
 
     movement = get_movement(agent.ship.position, agent.target.position, map_game, commands)
 
-    return agent.ship.move(movement)
+    return commands.move(agent.ship, movement)
 
 def on_target(agent):
     """check if the agent is on his target
@@ -230,7 +167,7 @@ def accomplish_mission(agent, game, commands, map_game):
     Arguments:
         game object -- Halite game object
         ship object -- Halite game object
-        commands list of string -- commands given to the ships
+        commands CommandBuilder -- commands given to the ships
         map_game Map custom object
     
     Returns:
@@ -243,7 +180,7 @@ def accomplish_mission(agent, game, commands, map_game):
 
     else:
 
-        return agent.ship.stay_still()
+        return commands.stay_still(agent.ship)
 
 
 def mission_accomplished(agent, game):
@@ -291,83 +228,41 @@ def no_ship_close_shipyard(game):
 
     return True
 
-def check_other_ships_movement(game, commands):
-    """Check the commands of all the other ships to make sure that they will be no collision on the n+1 turn
-    
-    Arguments:
-        game object -- Halite game object
-        commands list of string -- commands given to the ships
-    
-    Returns:
-        List of coordinates already used
-    """
-
-    next_used_case = []
-
-    for command in commands:
-
-        command_split = command.split(" ")
-        logging.info(command_split)
-
-        if command_split[0] in ["m"]:
-
-            direction = command_split[2]
-            ships = get_ships(game)
-            ships += get_enemy_ships(game)
-
-            for ship in ships:
-
-                if ship.id == int(command_split[1]):
-                    if direction in ["n"]:
-                        next_used_case.append(Position(ship.position.x , ship.position.y-1)) 
-                    if direction in ["s"]:
-                        next_used_case.append(Position(ship.position.x , ship.position.y+1)) 
-                    if direction in ["e"]:
-                        next_used_case.append(Position(ship.position.x+1 , ship.position.y)) 
-                    if direction in ["w"]:
-                        next_used_case.append(Position(ship.position.x-1 , ship.position.y)) 
-                    if direction in ["o"]:
-                        next_used_case.append(Position(ship.position.x , ship.position.y))
-    
-    return next_used_case
-
-
+@timed("movement")
 def get_movement(position1, position2, map_game, commands):
     """ general method for an agent to get his movement order
     
     Arguments:
         Position1 Position object -- agent
         Position2 Position object -- target 
-        commands list of string -- commands given to the ships
+        commands CommandBuilder -- commands given to the ships
         map_game Map custom object
     
     Returns:
         [type] -- [description]
     """
 
-    other_movs = check_other_ships_movement(game, commands)
-    lst_ship_pos = [ship.position for ship in get_ships(game)]
-    lst_ship_pos += [ship.position for ship in get_enemy_ships(game)]
+    occupancy = game.game_map.occupancy
 
     #map_game.map_nodes[Position(position1.x-1, position1.y)] != -1 and
     if position1.x > position2.x:
-        if (Position(position1.x-1, position1.y) not in other_movs) and (Position(position1.x-1, position1.y) not in lst_ship_pos):
+        if not commands.is_reserved(Position(position1.x-1, position1.y)) and not occupancy.is_occupied(Position(position1.x-1, position1.y)):
             return Direction.West
         else:
             return Direction.East
     elif position1.x < position2.x:
-        if (Position(position1.x+1, position1.y) not in other_movs) and (Position(position1.x+1, position1.y) not in lst_ship_pos):
+        if not commands.is_reserved(Position(position1.x+1, position1.y)) and not occupancy.is_occupied(Position(position1.x+1, position1.y)):
             return Direction.East
         else:
             return Direction.West
     elif position1.x == position2.x:
         if position1.y > position2.y:
-            if (Position(position1.x, position1.y-1) not in other_movs) and (Position(position1.x, position1.y-1) not in lst_ship_pos):
+            if not commands.is_reserved(Position(position1.x, position1.y-1)) and not occupancy.is_occupied(Position(position1.x, position1.y-1)):
                 return Direction.North
             else:
                 return Direction.South
         elif position1.y < position2.y:
-            if (Position(position1.x, position1.y+1) not in other_movs) and (Position(position1.x, position1.y+1) not in lst_ship_pos):
+            if not commands.is_reserved(Position(position1.x, position1.y+1)) and not occupancy.is_occupied(Position(position1.x, position1.y+1)):
                 return Direction.South
             else:
                 return Direction.North
@@ -379,10 +274,11 @@ class Map_node:
     """
     def __init__(self, position):
 
-        self.up = game.game_map[position.x, position.y-1]
-        self.down = game.game_map[position.x, position.y+1]
-        self.rigth = game.game_map[position.x+1, position.y]
-        self.left = game.game_map[position.x-1, position.y]
+        up, down, rigth, left = game.game_map.neighbours[game.game_map.cell_index(position)].tolist()
+        self.up = game.game_map[game.game_map.index_position(up)]
+        self.down = game.game_map[game.game_map.index_position(down)]
+        self.rigth = game.game_map[game.game_map.index_position(rigth)]
+        self.left = game.game_map[game.game_map.index_position(left)]
         self.position = game.game_map[position]
         self.value = -1 if game.game_map[position].ship else game.game_map[position].halite_amount
         self.is_targeted = False
@@ -434,15 +330,15 @@ class Agent:
 
     def get_target(self, game, map_game):
 
-        self.target = look_best_cell(self.ship, game, 4, [])
+        range_look = 4
 
-        range_count = 0 
+        self.target = look_best_cell(self.ship, game, range_look, [])
 
-        while not self.target:
+        while not self.target and range_look < game.game_map.width + game.game_map.height:
 
-            range_count += range_count
+            range_look *= 2
 
-            look_best_cell(self.ship, game, 4 + range_count, [])
+            self.target = look_best_cell(self.ship, game, range_look, [])
 
 
 class Actions:
@@ -453,6 +349,7 @@ class Actions:
         self.agents = {}
         self.created = 0
 
+    @timed("targets")
     def get_best_cell(self, curr_agent,  game, radius):
     
         avoid_cells = []
@@ -465,6 +362,7 @@ class Actions:
 
         return look_best_cell(curr_agent.ship, game, radius, avoid_cells)
     
+    @timed("actions_update")
     def update(self, game):
         """ update function, that , every turn update the info of the agents,
         if they are dead they are popped of the list
@@ -487,6 +385,7 @@ class Actions:
                 del self.agents[ship_id]
 
 
+    @timed("give_ordres")
     def give_ordres(self, game, turn, map_game):
         """Main function, runs differents checks and give differents orders 
         
@@ -496,12 +395,12 @@ class Actions:
         map_game Map custom object
         
         Returns:
-            List of string commands
+            CommandBuilder -- the commands of the turn
         """
-        commands = []
+        commands = CommandBuilder(game.game_map)
 
         if not self.agents:
-            commands.append(game.me.shipyard.spawn())
+            commands.spawn()
             self.created = 0
 
         agents = self.agents.values()
@@ -518,7 +417,7 @@ class Actions:
 
             if agent.returning:
 
-                commands.append(go_dropoff(agent.ship, game, commands, map_game))
+                go_dropoff(agent.ship, game, commands, map_game)
 
             else :
                 
@@ -531,7 +430,7 @@ class Actions:
 
                 if agent.mission:
 
-                    commands.append(accomplish_mission(agent, game, commands, map_game))
+                    accomplish_mission(agent, game, commands, map_game)
 
                 else:
 
@@ -545,7 +444,7 @@ class Actions:
 
         if game.me.halite_amount > 1999 and len(self.agents) < 10 and no_ship_close_shipyard(game) and turn < 150:
             if self.created > 5:
-                commands.append(game.me.shipyard.spawn())
+                commands.spawn()
                 self.created = 0
 
         self.created += 1
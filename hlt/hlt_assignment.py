@@ -0,0 +1,91 @@
+import heapq
+
+
+def min_cost_assignment(options):
+    """
+    Solve a sparse min-cost assignment: give every agent one of its targets, no target to two agents,
+    minimizing the total cost.
+
+    Runs successive shortest augmenting paths with Dijkstra on reduced costs, so each agent costs a
+    search over the part of the graph it competes for rather than over every pair.
+    :param options: For each agent, a list of (cost, target) pairs; costs must be non-negative and
+        targets hashable. A full assignment must exist.
+    :return: For each agent, its assigned target
+    """
+    # Work on integer target ids so heap entries always compare
+    targets = []
+    target_ids = {}
+    for agent_options in options:
+        for _, target in agent_options:
+            if target not in target_ids:
+                target_ids[target] = len(targets)
+                targets.append(target)
+    options = [[(cost, target_ids[target]) for cost, target in agent_options] for agent_options in options]
+
+    agent_count = len(options)
+    agent_potential = [0] * agent_count
+    target_potential = {}
+    # The agent holding each target and the target of each agent
+    holder = {}
+    assigned = [None] * agent_count
+
+    for start in range(agent_count):
+        agent_distance = {start: 0}
+        target_distance = {}
+        # Agent that reached each target on the shortest path found so far
+        reached_from = {}
+        done_agents = set()
+        done_targets = set()
+        frontier = [(0, 0, start)]
+        free_target = None
+        free_distance = 0
+        while frontier:
+            distance, kind, node = heapq.heappop(frontier)
+            if kind == 0:
+                if node in done_agents:
+                    continue
+                done_agents.add(node)
+                base = distance + agent_potential[node]
+                for cost, target in options[node]:
+                    if target in done_targets or assigned[node] == target:
+                        continue
+                    new_distance = base + cost - target_potential.get(target, 0)
+                    if new_distance < target_distance.get(target, new_distance + 1):
+                        target_distance[target] = new_distance
+                        reached_from[target] = node
+                        heapq.heappush(frontier, (new_distance, 1, target))
+            else:
+                if node in done_targets:
+                    continue
+                done_targets.add(node)
+                agent = holder.get(node)
+                if agent is None:
+                    free_target = node
+                    free_distance = distance
+                    break
+                # The only way out of a held target is back along its matched edge, which has a zero reduced cost
+                if distance < agent_distance.get(agent, distance + 1):
+                    agent_distance[agent] = distance
+                    heapq.heappush(frontier, (distance, 0, agent))
+
+        if free_target is None:
+            raise ValueError("No complete assignment exists")
+
+        # Keep reduced costs non-negative for the next searches
+        for agent in done_agents:
+            agent_potential[agent] += agent_distance[agent] - free_distance
+        for target in done_targets:
+            target_potential[target] = target_potential.get(target, 0) + target_distance[target] - free_distance
+
+        # Flip the matched edges along the augmenting path
+        target = free_target
+        while True:
+            agent = reached_from[target]
+            previous = assigned[agent]
+            assigned[agent] = target
+            holder[target] = agent
+            if agent == start:
+                break
+            target = previous
+
+    return [targets[target] for target in assigned]
@@ -0,0 +1,214 @@
+"""
+A batched simulator stepping many independent games in lockstep with NumPy.
+
+Games are held as stacked arrays: halite grids of shape (N, H, W) and ship tables of shape (N, S).
+It applies the same rules as hlt_engine (move burn, extraction, inspiration, collisions and deposits)
+to every game at once. It leaves dropoffs out and gives each player a fixed block of S / players ship slots.
+"""
+import numpy as np
+
+from hlt.hlt_engine import DEFAULT_CONSTANTS, INITIAL_HALITE, generate_map, max_turns
+
+"""Action codes of a ship: stay still, then north, south, east and west."""
+STILL, NORTH, SOUTH, EAST, WEST = range(5)
+ACTION_DX = np.array([0, 0, 0, 1, -1])
+ACTION_DY = np.array([0, -1, 1, 0, 0])
+
+
+class BatchSimulator:
+    """
+    N games on maps of the same size, stepped together.
+
+    Ship slot s belongs to player s // ships_per_player. A policy is a callable taking the simulator and
+    returning an (N, S) int array of actions and an (N, players) bool array of spawn requests.
+    """
+    def __init__(self, num_games, width, height, num_players=2, ships_per_player=32, seeds=None,
+                 game_constants=None):
+        """
+        :param num_games: The number of games N
+        :param width: The map width
+        :param height: The map height
+        :param num_players: 2 or 4
+        :param ships_per_player: The number of ship slots of each player
+        :param seeds: One map seed per game, defaults to range(num_games)
+        :param game_constants: Constants overriding the engine defaults
+        """
+        self.num_games = num_games
+        self.width = width
+        self.height = height
+        self.num_players = num_players
+        self.ships_per_player = ships_per_player
+        self.constants = dict(DEFAULT_CONSTANTS, MAX_TURNS=max_turns(width, height))
+        self.constants.update(game_constants or {})
+        seeds = list(range(num_games)) if seeds is None else list(seeds)
+
+        maps = []
+        for seed in seeds:
+            halite, shipyards = generate_map(width, height, num_players, seed)
+            maps.append(halite)
+        self.halite = np.array(maps, dtype=np.int32)
+        self.shipyard_x = np.array([x for x, _ in shipyards])
+        self.shipyard_y = np.array([y for _, y in shipyards])
+
+        slots = num_players * ships_per_player
+        self.owner = np.repeat(np.arange(num_players), ships_per_player)
+        self.ship_x = np.zeros((num_games, slots), dtype=np.int32)
+        self.ship_y = np.zeros((num_games, slots), dtype=np.int32)
+        self.cargo = np.zeros((num_games, slots), dtype=np.int32)
+        self.alive = np.zeros((num_games, slots), dtype=bool)
+        self.player_halite = np.full((num_games, num_players), INITIAL_HALITE, dtype=np.int64)
+        self.ships_built = np.zeros((num_games, num_players), dtype=np.int32)
+        self.turn = 0
+        self._games = np.arange(num_games)[:, None]
+
+    def is_over(self):
+        return self.turn >= self.constants["MAX_TURNS"]
+
+    def cell_halite(self):
+        """
+        :return: The (N, S) halite of the cell under each ship slot
+        """
+        return self.halite[self._games, self.ship_y, self.ship_x]
+
+    def inspired(self):
+        """
+        :return: The (N, S) mask of the alive ships with enough enemy ships within INSPIRATION_RADIUS
+        """
+        if not self.constants["INSPIRATION_ENABLED"]:
+            return np.zeros_like(self.alive)
+        # Pairwise wrapped distances, in int16 to halve the memory traffic of the (N, S, S) arrays
+        x = self.ship_x.astype(np.int16)
+        y = self.ship_y.astype(np.int16)
+        dx = np.abs(x[:, :, None] - x[:, None, :])
+        dy = np.abs(y[:, :, None] - y[:, None, :])
+        distance = np.minimum(dx, self.width - dx) + np.minimum(dy, self.height - dy)
+        enemy = (self.owner[:, None] != self.owner[None, :]) & self.alive[:, None, :]
+        close = enemy & (distance <= self.constants["INSPIRATION_RADIUS"])
+        return self.alive & (close.sum(axis=2) >= self.constants["INSPIRATION_SHIP_COUNT"])
+
+    def step(self, actions, spawn):
+        """
+        Apply one turn to every game.
+        :param actions: An (N, S) int array of action codes, ignored for dead slots
+        :param spawn: An (N, players) bool array of spawn requests
+        """
+        constants = self.constants
+        inspired = self.inspired()
+
+        # Moves, paid with 1/MOVE_COST_RATIO of the halite of the cell left
+        move_ratio = np.where(inspired, constants["INSPIRED_MOVE_COST_RATIO"], constants["MOVE_COST_RATIO"])
+        move_cost = self.cell_halite() // move_ratio
+        moving = self.alive & (actions != STILL) & (self.cargo >= move_cost)
+        self.cargo -= np.where(moving, move_cost, 0).astype(np.int32)
+        self.ship_x = np.where(moving, (self.ship_x + ACTION_DX[actions]) % self.width, self.ship_x).astype(np.int32)
+        self.ship_y = np.where(moving, (self.ship_y + ACTION_DY[actions]) % self.height, self.ship_y).astype(np.int32)
+
+        # Spawns, in the first free slot of the player
+        free = ~self.alive.reshape(self.num_games, self.num_players, self.ships_per_player)
+        spawning = (spawn & free.any(axis=2) &
+                    (self.player_halite >= constants["NEW_ENTITY_ENERGY_COST"]))
+        spawned = np.zeros_like(self.alive)
+        game_index, player_index = np.nonzero(spawning)
+        slot = player_index * self.ships_per_player + free.argmax(axis=2)[game_index, player_index]
+        spawned[game_index, slot] = True
+        self.alive |= spawned
+        self.ship_x[game_index, slot] = self.shipyard_x[player_index]
+        self.ship_y[game_index, slot] = self.shipyard_y[player_index]
+        self.cargo[game_index, slot] = 0
+        self.player_halite -= np.where(spawning, constants["NEW_ENTITY_ENERGY_COST"], 0)
+        self.ships_built += spawning
+
+        self._collide()
+
+        # Mining by the ships that did not move or spawn; no two alive ships share a cell anymore, but
+        # dead slots keep stale positions so only the mining ones are written back
+        mining = self.alive & ~moving & ~spawned
+        capacity = constants["MAX_ENERGY"] - self.cargo
+        extract_ratio = np.where(inspired, constants["INSPIRED_EXTRACT_RATIO"], constants["EXTRACT_RATIO"])
+        extracted = np.where(mining, np.minimum(self.cell_halite() // extract_ratio, capacity), 0)
+        game_index, slot = np.nonzero(mining)
+        self.halite[game_index, self.ship_y[game_index, slot], self.ship_x[game_index, slot]] -= \
+            extracted[game_index, slot].astype(np.int32)
+        bonus = np.where(inspired & mining, extracted * constants["INSPIRED_BONUS_MULTIPLIER"], 0).astype(np.int64)
+        self.cargo += (extracted + np.minimum(bonus, capacity - extracted)).astype(np.int32)
+
+        # Deposits at the shipyard of the owner
+        home = (self.alive & (self.ship_x == self.shipyard_x[self.owner]) &
+                (self.ship_y == self.shipyard_y[self.owner]))
+        game_index, slot = np.nonzero(home)
+        np.add.at(self.player_halite, (game_index, self.owner[slot]), self.cargo[game_index, slot])
+        self.cargo[home] = 0
+        self.turn += 1
+
+    def _collide(self):
+        """
+        Destroy every alive ship sharing its cell with another one. Cargo drops on the cell, or goes
+        to the owner of the shipyard the collision happened on.
+        """
+        cells = self.height * self.width
+        keys = np.where(self.alive, self._games * cells + self.ship_y * self.width + self.ship_x, -1)
+        alive_keys = keys[self.alive]
+        unique, counts = np.unique(alive_keys, return_counts=True)
+        crowded = unique[counts > 1]
+        if crowded.size == 0:
+            return
+        destroyed = self.alive & np.isin(keys, crowded)
+        game_index, slot = np.nonzero(destroyed)
+        x, y = self.ship_x[game_index, slot], self.ship_y[game_index, slot]
+        dropped = self.cargo[game_index, slot]
+
+        shipyard_owner = np.full((self.height, self.width), -1)
+        shipyard_owner[self.shipyard_y, self.shipyard_x] = np.arange(self.num_players)
+        owner = shipyard_owner[y, x]
+        on_shipyard = owner >= 0
+        np.add.at(self.player_halite, (game_index[on_shipyard], owner[on_shipyard]), dropped[on_shipyard])
+        np.add.at(self.halite, (game_index[~on_shipyard], y[~on_shipyard], x[~on_shipyard]), dropped[~on_shipyard])
+        self.alive &= ~destroyed
+        self.cargo[destroyed] = 0
+
+    def run(self, policy):
+        """
+        Play every game to the end.
+        :param policy: A callable taking this simulator and returning (actions, spawn)
+        :return: The (N, players) final halite of every player
+        """
+        while not self.is_over():
+            actions, spawn = policy(self)
+            self.step(np.asarray(actions, dtype=np.intp), np.asarray(spawn, dtype=bool))
+        return self.player_halite
+
+
+def threshold_policy(full, empty, spawn_until=0.5, seed=0):
+    """
+    A vectorized version of the mine-until-full strategy, with parameters that may differ per game.
+    Ships with at least full cargo head to the shipyard, ships on cells with less than empty halite move
+    randomly, other ships mine; players spawn while affordable during the first spawn_until of the game.
+    :param full: The cargo at which a ship returns, a scalar or an (N,) array
+    :param empty: The cell halite under which a ship moves on, a scalar or an (N,) array
+    :param spawn_until: The fraction of the game during which to spawn
+    :param seed: The seed of the random moves
+    :return: A policy for BatchSimulator.run
+    """
+    rng = np.random.default_rng(seed)
+
+    def policy(sim):
+        full_cargo = np.broadcast_to(np.asarray(full), (sim.num_games,))[:, None]
+        empty_cell = np.broadcast_to(np.asarray(empty), (sim.num_games,))[:, None]
+        actions = rng.integers(NORTH, WEST + 1, size=sim.alive.shape)
+        actions = np.where(sim.cell_halite() >= empty_cell, STILL, actions)
+
+        # Returning ships close the wrapped x gap first, then the y gap
+        dx = (sim.shipyard_x[sim.owner] - sim.ship_x) % sim.width
+        dy = (sim.shipyard_y[sim.owner] - sim.ship_y) % sim.height
+        home_x = np.where(dx == 0, STILL, np.where(dx <= sim.width // 2, EAST, WEST))
+        home_y = np.where(dy == 0, STILL, np.where(dy <= sim.height // 2, SOUTH, NORTH))
+        home = np.where(home_x != STILL, home_x, home_y)
+        actions = np.where(sim.cargo >= full_cargo, home, actions)
+
+        occupied = np.zeros((sim.num_games, sim.num_players), dtype=bool)
+        at_yard = sim.alive & (sim.ship_x == sim.shipyard_x[sim.owner]) & (sim.ship_y == sim.shipyard_y[sim.owner])
+        np.logical_or.at(occupied, (np.nonzero(at_yard)[0], sim.owner[np.nonzero(at_yard)[1]]), True)
+        spawn = ~occupied & (sim.turn < spawn_until * sim.constants["MAX_TURNS"])
+        return actions, spawn
+
+    return policy
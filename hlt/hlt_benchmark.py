@@ -0,0 +1,276 @@
+"""
+Benchmarks of the hlt primitives and of full bot turns, on synthetic games of every map size.
+
+Each scenario is a map size, a player count and a fleet size: the in-process engine generates the map, places
+the fleets and produces the engine input of a few turns. Micro benchmarks time GameMap methods on the game
+state after the first turn; the turn benchmark replays every turn into a bot script such as MyBot.py, timing
+update_frame, the bot's own work and sending the commands. Results are written as JSON and compared against
+a baseline:
+
+    python -m hlt.hlt_benchmark --output bench.json --baseline baseline.json --threshold 0.1
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from hlt.hlt_common import FrameReader, current_streams, use_streams
+from hlt.hlt_engine import HaliteEngine
+from hlt.hlt_game_map import GameMap
+from hlt.hlt_logging import MODE_ENVIRONMENT_VARIABLE
+from hlt.hlt_networking import Game
+from hlt.hlt_positionals import Position, active_pool
+from hlt.hlt_recording import Recording, replay
+from hlt.hlt_tournament import MAP_SIZES
+
+"""Ships per player of the scenarios."""
+FLEET_SIZES = (5, 20, 60)
+
+"""Relative slowdown over the baseline reported as a regression."""
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+DEFAULT_TURNS = 50
+DEFAULT_REPEAT = 5
+
+"""Shortest duration, in seconds, of a timed run of a micro benchmark, as timeit.Timer.autorange aims for."""
+DEFAULT_MIN_RUN_TIME = 0.1
+_SAMPLES = 1000
+
+DEFAULT_BOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "MyBot.py")
+
+
+def build_scenario(size, num_players, fleet, turns=DEFAULT_TURNS, seed=0):
+    """
+    Generate the engine input of a game with fleets already at sea. Ships stay still, mining their cells.
+    :param size: The width and height of the map
+    :param num_players: 2 or 4
+    :param fleet: The number of ships of each player, on distinct random cells
+    :param turns: The number of turns
+    :param seed: The seed of the map and of the ship placement
+    :return: A Recording of the input of player 0
+    """
+    engine = HaliteEngine(num_players, size, size, seed)
+    rng = random.Random(seed)
+    for index, cell in enumerate(rng.sample(range(size * size), fleet * num_players)):
+        engine.add_ship(index % num_players, cell % size, cell // size, rng.randrange(1000))
+    pre_game = engine.initial_input(0).encode()
+    frames = []
+    for _ in range(turns):
+        frames.append(engine.frame_input().encode())
+        engine.step([[] for _ in range(num_players)])
+    return Recording(pre_game, frames)
+
+
+def _load_game(recording):
+    """
+    :return: A Game updated with the first turn of a recording
+    """
+    previous_streams = current_streams()
+    use_streams(recording.stream(end_turn=recording.turns[0]), lambda line: None)
+    try:
+        game = Game()
+        game.update_frame()
+    finally:
+        use_streams(*previous_streams)
+    return game
+
+
+def _cell_values(frame, num_players):
+    """
+    :return: The decoded cell update section of a turn's input, as GameMap._update takes it
+    """
+    values = FrameReader(io.BytesIO(frame)).read_frame(num_players)
+    index = 1
+    for _ in range(num_players):
+        index += 4 + 4 * int(values[index + 1]) + 3 * int(values[index + 2])
+    return values[index:]
+
+
+def _time_per_call(function, arguments, repeat=DEFAULT_REPEAT, reset=None, min_time=DEFAULT_MIN_RUN_TIME):
+    """
+    :param function: The function to time
+    :param arguments: A list of argument tuples, a pass calling the function once with each
+    :param repeat: The number of timed runs, the fastest one counting
+    :param reset: A callable run after each pass, outside of the timing
+    :param min_time: The shortest duration of a run, in seconds: like timeit.Timer.autorange, runs make 1, 2, 5,
+        10, 20... passes, as many as the first count reaching it
+    :return: The mean nanoseconds per call of the fastest run
+    """
+    def run(passes):
+        elapsed = 0
+        for _ in range(passes):
+            started = time.perf_counter_ns()
+            for argument in arguments:
+                function(*argument)
+            elapsed += time.perf_counter_ns() - started
+            if reset is not None:
+                reset()
+        return elapsed
+
+    min_nanoseconds = min_time * 1e9
+    passes = None
+    scale = 1
+    while passes is None:
+        for candidate in (scale, 2 * scale, 5 * scale):
+            if run(candidate) >= min_nanoseconds:
+                passes = candidate
+                break
+        scale *= 10
+    return min(run(passes) for _ in range(repeat)) / (passes * len(arguments))
+
+
+def micro_benchmarks(recording, repeat=DEFAULT_REPEAT, seed=0, min_time=DEFAULT_MIN_RUN_TIME):
+    """
+    Time GameMap primitives on the state of a recording after its first turn, see _time_per_call.
+    :return: A dict of benchmark name to mean nanoseconds per call
+    """
+    game = _load_game(recording)
+    game_map = game.game_map
+    width, height = game_map.width, game_map.height
+    rng = random.Random(seed)
+    positions = [Position(rng.randrange(width), rng.randrange(height)) for _ in range(2 * _SAMPLES)]
+    pairs = list(zip(positions[::2], positions[1::2]))
+    results = {
+        "calculate_distance": _time_per_call(game_map.calculate_distance, pairs, repeat, min_time=min_time),
+        "normalize": _time_per_call(game_map.normalize, [
+            (Position(position.x + width, position.y - height, normalize=False),) for position in positions],
+            repeat, min_time=min_time),
+        "get_unsafe_moves": _time_per_call(game_map.get_unsafe_moves, pairs, repeat, min_time=min_time),
+    }
+
+    # naive_navigate marks the cells it moves ships onto, unmarked after each pass
+    marked = len(game_map._marked_cells)
+
+    def unmark():
+        for cell in game_map._marked_cells[marked:]:
+            cell.ship = None
+        del game_map._marked_cells[marked:]
+    ships = game.me.get_ships()
+    if ships:
+        results["naive_navigate"] = _time_per_call(
+            game_map.naive_navigate, [(ship, positions[index]) for index, ship in enumerate(ships)], repeat, unmark,
+            min_time)
+
+    frame = recording.frames[1] if len(recording.frames) > 1 else recording.frames[0]
+    results["_update"] = _time_per_call(game_map._update, [(_cell_values(frame, recording.num_players),)], repeat,
+                                        min_time=min_time)
+
+    # Feeds the map section of the pre-game input, after the constants, the player count and the shipyards
+    lines = recording.pre_game.splitlines(keepends=True)
+    map_input = b"".join(lines[2 + recording.num_players:])
+    previous_streams = current_streams()
+    previous_pool = active_pool()
+
+    def generate():
+        use_streams(io.BytesIO(map_input))
+        GameMap._generate()
+    try:
+        results["_generate"] = _time_per_call(generate, [()], repeat, min_time=min_time)
+    finally:
+        use_streams(*previous_streams)
+        # _generate activated the position pool of the maps it built on this thread
+        previous_pool.activate()
+    return results
+
+
+def turn_benchmark(recording, bot=DEFAULT_BOT):
+    """
+    Replay a recording into a bot script.
+    :return: A dict of the mean, p50, p95 and max milliseconds per turn
+    """
+    times = sorted(1000 * seconds for _, _, seconds in replay(recording, bot))
+    return {"mean_ms": sum(times) / len(times),
+            "p50_ms": times[(len(times) - 1) // 2],
+            "p95_ms": times[int(0.95 * (len(times) - 1))],
+            "max_ms": times[-1]}
+
+
+def run_benchmarks(sizes=MAP_SIZES, player_counts=(2, 4), fleets=FLEET_SIZES, turns=DEFAULT_TURNS,
+                   repeat=DEFAULT_REPEAT, bot=DEFAULT_BOT, seed=0, min_time=DEFAULT_MIN_RUN_TIME):
+    """
+    Run the micro benchmarks and the turn benchmark of every scenario.
+    :return: A dict with the "machine" the benchmarks ran on and the "results", mapping names such as
+        "normalize/32x32/2p/20" to a dict whose "value" is compared against the baseline
+    """
+    results = {}
+    for size in sizes:
+        for num_players in player_counts:
+            for fleet in fleets:
+                scenario = "{0}x{0}/{1}p/{2}".format(size, num_players, fleet)
+                recording = build_scenario(size, num_players, fleet, turns, seed)
+                for name, nanoseconds in micro_benchmarks(recording, repeat, seed, min_time).items():
+                    results["{}/{}".format(name, scenario)] = {"value": nanoseconds, "unit": "ns"}
+                if bot:
+                    turn = turn_benchmark(recording, bot)
+                    results["turn/{}".format(scenario)] = dict(turn, value=turn["p50_ms"], unit="ms")
+    machine = {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+               "processor": platform.processor()}
+    return {"machine": machine, "results": results}
+
+
+def compare(current, baseline, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """
+    :param current: The results of run_benchmarks
+    :param baseline: Earlier results of run_benchmarks
+    :param threshold: The relative slowdown counted as a regression
+    :return: A sorted list of (name, baseline value, current value, ratio, regressed) for the benchmarks in both
+    """
+    rows = []
+    for name, result in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None or not base["value"]:
+            continue
+        ratio = result["value"] / base["value"]
+        rows.append((name, base["value"], result["value"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def format_comparison(rows):
+    lines = ["{:<36} {:>12} {:>12} {:>8}".format("benchmark", "baseline", "current", "ratio")]
+    for name, base, value, ratio, regressed in rows:
+        lines.append("{:<36} {:>12.1f} {:>12.1f} {:>7.2f}x{}".format(
+            name, base, value, ratio, "  REGRESSION" if regressed else ""))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hlt primitives and full bot turns.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(MAP_SIZES))
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 4], choices=[2, 4])
+    parser.add_argument("--fleets", type=int, nargs="+", default=list(FLEET_SIZES), help="Ships per player")
+    parser.add_argument("--turns", type=int, default=DEFAULT_TURNS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_RUN_TIME,
+                        help="Shortest duration of a timed micro benchmark run, in seconds")
+    parser.add_argument("--bot", default=DEFAULT_BOT, help="The bot script of the turn benchmark, empty to skip it")
+    parser.add_argument("--output", default=None, help="JSON file to write the results into")
+    parser.add_argument("--baseline", default=None, help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    # The games run in this process; keep their bots from writing bot-0.log
+    os.environ[MODE_ENVIRONMENT_VARIABLE] = "off"
+    current = run_benchmarks(args.sizes, args.players, args.fleets, args.turns, args.repeat, args.bot,
+                             min_time=args.min_time)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(current, output_file, indent=1, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            rows = compare(current, json.load(baseline_file), args.threshold)
+        print(format_comparison(rows))
+        if any(regressed for *_, regressed in rows):
+            sys.exit(1)
+    else:
+        for name, result in sorted(current["results"].items()):
+            print("{:<36} {:>12.1f} {}".format(name, result["value"], result["unit"]))
+
+
+if __name__ == "__main__":
+    main()
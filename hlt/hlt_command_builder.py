@@ -0,0 +1,104 @@
+import hlt.hlt_commands as commands
+
+from hlt.hlt_positionals import Direction
+
+_DIRECTIONS = {
+    commands.NORTH: Direction.North,
+    commands.SOUTH: Direction.South,
+    commands.EAST: Direction.East,
+    commands.WEST: Direction.West,
+    commands.STAY_STILL: Direction.Still,
+}
+
+
+class CommandBuilder:
+    """
+    Collects the commands of a turn in structured form.
+
+    Every move is recorded as a (ship, direction, destination) tuple and its destination cell is reserved,
+    so checking whether a cell is already taken for next turn is a single lookup. Commands are only turned
+    into engine strings when iterated, which Game.end_turn does.
+    """
+    def __init__(self, game_map):
+        """
+        :param game_map: The map of the game, used to resolve move destinations
+        """
+        self.game_map = game_map
+        self.moves = []
+        self._reservations = {}
+        self._spawn = False
+        # Move tuples and engine strings, in the order they were issued
+        self._entries = []
+
+    def move(self, ship, direction):
+        """
+        Move a ship and reserve its destination cell.
+        :param ship: The ship to move
+        :param direction: A Direction cardinal tuple or the engine's direction character
+        :return: The recorded (ship, direction, destination) tuple
+        """
+        direction = _DIRECTIONS.get(direction, direction)
+        destination = self.game_map.normalize(ship.position.directional_offset(direction))
+        move = (ship, direction, destination)
+        self.moves.append(move)
+        self._entries.append(move)
+        self._reservations[destination] = move
+        return move
+
+    def stay_still(self, ship):
+        """
+        Keep a ship on its cell, reserving it.
+        """
+        return self.move(ship, Direction.Still)
+
+    def spawn(self):
+        """
+        Spawn a new ship at the shipyard.
+        """
+        self._spawn = True
+        self._entries.append(commands.GENERATE)
+
+    def make_dropoff(self, ship):
+        """
+        Transform a ship into a dropoff.
+        """
+        self._entries.append("{} {}".format(commands.CONSTRUCT, ship.id))
+
+    def append(self, command):
+        """
+        Add an already formatted engine command. It does not reserve any cell.
+        """
+        self._entries.append(command)
+
+    def is_reserved(self, position):
+        """
+        :return: Whether a ship has already been ordered onto the cell at position this turn
+        """
+        return position in self._reservations
+
+    def reservation_at(self, position):
+        """
+        :return: The (ship, direction, destination) move reserving the cell at position, or None
+        """
+        return self._reservations.get(position)
+
+    @property
+    def is_spawning(self):
+        """
+        :return: Whether a ship is spawned this turn
+        """
+        return self._spawn
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        """
+        Yields the engine strings of every command of the turn, in the order they were issued.
+        """
+        for entry in self._entries:
+            if isinstance(entry, tuple):
+                ship, direction, _ = entry
+                yield "{} {} {}".format(commands.MOVE, ship.id, Direction.convert(direction))
+            else:
+                yield entry
@@ -1,4 +1,80 @@
+import builtins
 import logging
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Per thread redirection of the engine streams, used to run bots in-process
+_streams = threading.local()
+
+
+def use_streams(input_stream=None, output=None):
+    """
+    Redirect the engine input and output of the current thread, e.g. to run a bot against an in-process engine.
+    :param input_stream: A binary stream with a readline() method to read engine input from, None for stdin
+    :param output: A callable taking each line sent to the engine, None for stdout
+    """
+    _streams.input = input_stream
+    _streams.output = output
+
+
+def current_streams():
+    """
+    :return: The (input_stream, output) redirection of the current thread, None for each one not redirected
+    """
+    return getattr(_streams, 'input', None), getattr(_streams, 'output', None)
+
+
+def run_script(path, init_globals=None):
+    """
+    Run a bot script such as MyBot.py on the current thread, as its own __main__ module, until it exits.
+    Unlike runpy, it leaves sys.modules["__main__"] alone, which scripts running concurrently would race on.
+    :param path: The path of the script
+    :param init_globals: A dict of globals the script starts with
+    """
+    path = os.path.abspath(path)
+    with open(path) as script:
+        code = compile(script.read(), path, "exec")
+    namespace = {"__name__": "__main__", "__file__": path, "__builtins__": builtins}
+    namespace.update(init_globals or {})
+    try:
+        exec(code, namespace)
+    except SystemExit:
+        pass
+
+
+def _input_stream():
+    """
+    :return: The binary input stream of this thread, or None if stdin has been replaced by a text-only stream
+    """
+    stream = getattr(_streams, 'input', None)
+    if stream is not None:
+        return stream
+    return getattr(sys.stdin, 'buffer', None)
+
+
+def write_output(line):
+    """
+    Sends a line to the engine, on stdout unless this thread's output is redirected.
+    :param line: The line to send, without its newline
+    """
+    output = getattr(_streams, 'output', None)
+    if output is not None:
+        output(line)
+        return
+    print(line)
+    sys.stdout.flush()
+
+
+def _end_of_input():
+    """
+    Shuts down logging and exits once the engine closes the input stream
+    """
+    logging.shutdown()
+    raise SystemExit(EOFError("EOF when reading a line"))
+
 
 # Placed here to avoid circular imports
 def read_input():
@@ -6,8 +82,78 @@ def read_input():
     Reads input from stdin, shutting down logging and exiting if an EOFError occurs
     :return: input read
     """
-    try:
-        return input()
-    except EOFError as eof:
-        logging.shutdown()
-        raise SystemExit(eof)
+    stream = _input_stream()
+    if stream is None:
+        try:
+            return input()
+        except EOFError as eof:
+            logging.shutdown()
+            raise SystemExit(eof)
+    line = stream.readline()
+    if not line:
+        _end_of_input()
+    return line.decode().rstrip("\r\n")
+
+
+class FrameReader:
+    """
+    Reads a whole engine turn at once and decodes all of its integers in a single pass.
+
+    A frame is laid out as sent by the engine: the turn number, then for each player its
+    "player num_ships num_dropoffs halite" header followed by its ship (id x y halite) and
+    dropoff (id x y) lines, then the number of changed cells followed by their (x y halite) lines.
+    """
+    def __init__(self, stream=None):
+        """
+        :param stream: A binary stream to read from, defaults to stdin
+        """
+        self._stream = stream
+
+    def read_frame(self, num_players, on_first_line=None):
+        """
+        Reads the lines of one turn and decodes them.
+        :param num_players: The number of players in the game
+        :param on_first_line: A callable run once the first line has arrived, before the rest is read and decoded
+        :return: An int64 array holding every integer of the frame, in order
+        """
+        stream = self._stream if self._stream is not None else _input_stream()
+        if stream is None:
+            return np.array(" ".join(self._read_text_frame(num_players, on_first_line)).split(), dtype=np.int64)
+
+        readline = stream.readline
+        lines = [readline()]
+        if on_first_line is not None:
+            on_first_line()
+        for _ in range(num_players):
+            header = readline()
+            if not header:
+                _end_of_input()
+            lines.append(header)
+            _, num_ships, num_dropoffs, _ = header.split()
+            lines.extend([readline() for _ in range(int(num_ships) + int(num_dropoffs))])
+        num_cells = readline()
+        if not num_cells:
+            _end_of_input()
+        lines.append(num_cells)
+        lines.extend([readline() for _ in range(int(num_cells))])
+        if b"" in lines:
+            _end_of_input()
+        return np.fromstring(b" ".join(lines), dtype=np.int64, sep=" ")
+
+    @staticmethod
+    def _read_text_frame(num_players, on_first_line=None):
+        """
+        Fallback for a text-only stdin: reads the lines of one turn with read_input.
+        """
+        lines = [read_input()]
+        if on_first_line is not None:
+            on_first_line()
+        for _ in range(num_players):
+            header = read_input()
+            lines.append(header)
+            _, num_ships, num_dropoffs, _ = header.split()
+            lines.extend([read_input() for _ in range(int(num_ships) + int(num_dropoffs))])
+        num_cells = read_input()
+        lines.append(num_cells)
+        lines.extend([read_input() for _ in range(int(num_cells))])
+        return lines
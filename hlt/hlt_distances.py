@@ -0,0 +1,108 @@
+import numpy as np
+
+"""Largest map (in cells) for which the full cell-to-cell table may be built."""
+FULL_TABLE_MAX_CELLS = 64 * 64
+
+
+class DistanceTable:
+    """
+    Precomputed wrap-around Manhattan distances for a map of a given size.
+
+    The per axis distances are tabulated once, so every lookup is a pair of table reads.
+    Vectorized lookups take positions or x/y coordinate arrays and return NumPy arrays.
+    """
+    def __init__(self, width, height, full_table=False):
+        self.width = width
+        self.height = height
+        self.x_table = self._axis_table(width)
+        self.y_table = self._axis_table(height)
+        # Nested lists are faster than NumPy for scalar reads
+        self._x_rows = self.x_table.tolist()
+        self._y_rows = self.y_table.tolist()
+        self._full_table = None
+        if full_table:
+            self.full_table()
+
+    @staticmethod
+    def _axis_table(size):
+        """
+        :param size: The length of the axis
+        :return: A (size, size) array of wrap-around distances between any two coordinates of the axis
+        """
+        coordinates = np.arange(size)
+        delta = np.abs(coordinates[:, None] - coordinates[None, :])
+        return np.minimum(delta, size - delta).astype(np.int32)
+
+    def full_table(self):
+        """
+        Build (once) and return the full cell-to-cell distance table.
+        Cells are indexed by y * width + x.
+        :return: A (width * height, width * height) uint8 array of distances
+        """
+        if self._full_table is None:
+            if self.width * self.height > FULL_TABLE_MAX_CELLS:
+                raise ValueError("Map too large for a full distance table: {}x{}".format(self.width, self.height))
+            flat_x = np.tile(np.arange(self.width), self.height)
+            flat_y = np.repeat(np.arange(self.height), self.width)
+            self._full_table = (self.x_table[np.ix_(flat_x, flat_x)] +
+                                self.y_table[np.ix_(flat_y, flat_y)]).astype(np.uint8)
+        return self._full_table
+
+    def distance(self, source, target):
+        """
+        Compute the Manhattan distance between two positions.
+        Accounts for wrap-around.
+        :param source: The source position
+        :param target: The target position
+        :return: The distance between these positions
+        """
+        return self._x_rows[source.x % self.width][target.x % self.width] + \
+            self._y_rows[source.y % self.height][target.y % self.height]
+
+    def axis_distances(self, target):
+        """
+        :param target: The target position
+        :return: The lists of the distances from every x coordinate to the target's, and from every y coordinate
+            to the target's; the distance from (x, y) is their sum
+        """
+        return self._x_rows[target.x % self.width], self._y_rows[target.y % self.height]
+
+    def coordinates(self, positions):
+        """
+        Convert positions to normalized coordinate arrays.
+        :param positions: An iterable of positions, or a tuple of (xs, ys) arrays
+        :return: A tuple of x and y int arrays
+        """
+        if isinstance(positions, tuple):
+            xs, ys = positions
+        else:
+            positions = list(positions)
+            xs = [position.x for position in positions]
+            ys = [position.y for position in positions]
+        return np.asarray(xs, dtype=np.int64) % self.width, np.asarray(ys, dtype=np.int64) % self.height
+
+    def one_to_many(self, source, targets):
+        """
+        :param source: The source position
+        :param targets: An iterable of positions, or a tuple of (xs, ys) arrays
+        :return: An array of the distances from source to each target
+        """
+        xs, ys = self.coordinates(targets)
+        return self.x_table[source.x % self.width, xs] + self.y_table[source.y % self.height, ys]
+
+    def many_to_many(self, sources, targets):
+        """
+        :param sources: An iterable of positions, or a tuple of (xs, ys) arrays
+        :param targets: An iterable of positions, or a tuple of (xs, ys) arrays
+        :return: A (len(sources), len(targets)) array of distances
+        """
+        source_xs, source_ys = self.coordinates(sources)
+        target_xs, target_ys = self.coordinates(targets)
+        return self.x_table[np.ix_(source_xs, target_xs)] + self.y_table[np.ix_(source_ys, target_ys)]
+
+    def distance_grid(self, source):
+        """
+        :param source: The source position
+        :return: A (height, width) array of the distances from source to every cell
+        """
+        return self.y_table[source.y % self.height][:, None] + self.x_table[source.x % self.width][None, :]
@@ -0,0 +1,560 @@
+"""
+A headless, in-process Halite engine for local games.
+
+It follows the rules described by hlt_constants: ship and dropoff costs, extraction, move costs,
+inspiration, collisions and MAX_TURNS, and speaks the same text protocol as the official engine.
+Bots run either as callables on the engine's thread (FunctionBot) or as bot scripts such as MyBot.py
+on their own thread (ScriptBot), reading and writing through in-memory pipes instead of stdin/stdout.
+"""
+import collections
+import contextlib
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+import hlt.hlt_commands as commands
+from hlt.hlt_common import use_streams, current_streams, run_script
+
+"""Constants sent to the bots, as the official engine defaults them."""
+DEFAULT_CONSTANTS = {
+    "NEW_ENTITY_ENERGY_COST": 1000,
+    "DROPOFF_COST": 4000,
+    "MAX_ENERGY": 1000,
+    "EXTRACT_RATIO": 4,
+    "MOVE_COST_RATIO": 10,
+    "INSPIRATION_ENABLED": True,
+    "INSPIRATION_RADIUS": 4,
+    "INSPIRATION_SHIP_COUNT": 2,
+    "INSPIRED_EXTRACT_RATIO": 4,
+    "INSPIRED_BONUS_MULTIPLIER": 2.0,
+    "INSPIRED_MOVE_COST_RATIO": 10,
+    "CAPTURE_ENABLED": False,
+}
+
+"""Halite each player starts with."""
+INITIAL_HALITE = 5000
+
+"""Seconds a bot with a turn timeout gets to start and send its name, as the official engine allows."""
+INITIAL_TIMEOUT = 30.0
+
+_OFFSETS = {
+    commands.NORTH: (0, -1),
+    commands.SOUTH: (0, 1),
+    commands.EAST: (1, 0),
+    commands.WEST: (-1, 0),
+}
+
+
+def max_turns(width, height):
+    """
+    :return: The number of turns of a game on a map of this size, 400 on 32x32 up to 500 on 64x64
+    """
+    return 300 + 25 * max(width, height) // 8
+
+
+def generate_map(width, height, num_players, seed):
+    """
+    Generates a symmetric map: a smoothed random tile mirrored once per player.
+    :param width: The map width, even
+    :param height: The map height, even when there are 4 players
+    :param num_players: 2 or 4
+    :param seed: The random seed
+    :return: A tuple of the [y][x] halite lists and the list of (x, y) shipyard positions
+    """
+    if num_players not in (2, 4):
+        raise ValueError("Only 2 and 4 player maps are supported")
+    rng = random.Random(seed)
+    tile_width = width // 2
+    tile_height = height // 2 if num_players == 4 else height
+
+    tile = [[rng.random() ** 3 for _ in range(tile_width)] for _ in range(tile_height)]
+    for _ in range(2):
+        tile = [[sum(tile[(y + dy) % tile_height][(x + dx) % tile_width]
+                     for dy in (-1, 0, 1) for dx in (-1, 0, 1)) / 9
+                 for x in range(tile_width)] for y in range(tile_height)]
+    peak = max(max(row) for row in tile) or 1
+    tile = [[int(1000 * value / peak) for value in row] for row in tile]
+
+    halite = [row + row[::-1] for row in tile]
+    if num_players == 4:
+        # Copy the mirrored rows, the engine mines the cells in place
+        halite = halite + [list(row) for row in halite[::-1]]
+
+    x, y = tile_width // 2, tile_height // 2
+    shipyards = [(x, y), (width - 1 - x, y)]
+    if num_players == 4:
+        shipyards += [(x, height - 1 - y), (width - 1 - x, height - 1 - y)]
+    return halite, shipyards
+
+
+class _Ship:
+    __slots__ = ('id', 'owner', 'x', 'y', 'halite')
+
+    def __init__(self, ship_id, owner, x, y):
+        self.id = ship_id
+        self.owner = owner
+        self.x = x
+        self.y = y
+        self.halite = 0
+
+
+class _Player:
+    __slots__ = ('id', 'halite', 'shipyard', 'dropoffs', 'ships', 'ships_built')
+
+    def __init__(self, player_id, shipyard):
+        self.id = player_id
+        self.halite = INITIAL_HALITE
+        self.shipyard = shipyard
+        self.dropoffs = {}
+        self.ships = {}
+        self.ships_built = 0
+
+
+class HaliteEngine:
+    """
+    The state and rules of one game.
+
+    Each turn, frame_input() gives the text sent to every bot and step() applies their commands.
+    """
+    def __init__(self, num_players, width, height, seed=0, game_constants=None):
+        """
+        :param num_players: 2 or 4
+        :param width: The map width
+        :param height: The map height
+        :param seed: The map seed
+        :param game_constants: Constants overriding DEFAULT_CONSTANTS
+        """
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.constants = dict(DEFAULT_CONSTANTS, MAX_TURNS=max_turns(width, height), game_seed=seed)
+        self.constants.update(game_constants or {})
+        self.halite, shipyards = generate_map(width, height, num_players, seed)
+        self.players = [_Player(player_id, shipyard) for player_id, shipyard in enumerate(shipyards)]
+        self._structures = {shipyard: player_id for player_id, shipyard in enumerate(shipyards)}
+        self.turn = 0
+        self._next_ship_id = 0
+        self._next_dropoff_id = 0
+        self._changed = {}
+        self._diamond = [(dx, dy) for dy in range(-self.constants["INSPIRATION_RADIUS"],
+                                                  self.constants["INSPIRATION_RADIUS"] + 1)
+                         for dx in range(abs(dy) - self.constants["INSPIRATION_RADIUS"],
+                                         self.constants["INSPIRATION_RADIUS"] - abs(dy) + 1)]
+
+    @property
+    def max_turns(self):
+        return self.constants["MAX_TURNS"]
+
+    def initial_input(self, player_id):
+        """
+        :return: The pre-game text sent to a player
+        """
+        lines = [json.dumps(self.constants), "{} {}".format(len(self.players), player_id)]
+        for player in self.players:
+            lines.append("{} {} {}".format(player.id, *player.shipyard))
+        lines.append("{} {}".format(self.width, self.height))
+        for row in self.halite:
+            lines.append(" ".join(map(str, row)))
+        return "\n".join(lines) + "\n"
+
+    def add_ship(self, player_id, x, y, halite=0):
+        """
+        Put a ship on the map outside of the rules, e.g. to build a mid-game position.
+        :return: The id of the new ship
+        """
+        ship = _Ship(self._next_ship_id, player_id, x, y)
+        ship.halite = halite
+        self._next_ship_id += 1
+        self.players[player_id].ships[ship.id] = ship
+        return ship.id
+
+    def frame_input(self):
+        """
+        Start the next turn.
+        :return: The text of the turn, sent to every player
+        """
+        self.turn += 1
+        lines = [str(self.turn)]
+        for player in self.players:
+            lines.append("{} {} {} {}".format(player.id, len(player.ships), len(player.dropoffs), player.halite))
+            for ship in player.ships.values():
+                lines.append("{} {} {} {}".format(ship.id, ship.x, ship.y, ship.halite))
+            for dropoff_id, (x, y) in player.dropoffs.items():
+                lines.append("{} {} {}".format(dropoff_id, x, y))
+        lines.append(str(len(self._changed)))
+        for (x, y), halite in self._changed.items():
+            lines.append("{} {} {}".format(x, y, halite))
+        self._changed = {}
+        return "\n".join(lines) + "\n"
+
+    def is_over(self):
+        return self.turn >= self.max_turns
+
+    def _set_halite(self, x, y, halite):
+        self.halite[y][x] = halite
+        self._changed[(x, y)] = halite
+
+    def _inspired(self):
+        """
+        :return: The ids of the ships with at least INSPIRATION_SHIP_COUNT enemy ships within INSPIRATION_RADIUS
+        """
+        if not self.constants["INSPIRATION_ENABLED"]:
+            return set()
+        owners = {(ship.x, ship.y): ship.owner for player in self.players for ship in player.ships.values()}
+        needed = self.constants["INSPIRATION_SHIP_COUNT"]
+        width, height = self.width, self.height
+        inspired = set()
+        for player in self.players:
+            for ship in player.ships.values():
+                count = 0
+                for dx, dy in self._diamond:
+                    owner = owners.get(((ship.x + dx) % width, (ship.y + dy) % height))
+                    if owner is not None and owner != ship.owner:
+                        count += 1
+                        if count >= needed:
+                            inspired.add(ship.id)
+                            break
+        return inspired
+
+    def _construct(self, player, ship):
+        """
+        Turn a ship into a dropoff if its cell is free and the player can pay the rest of the cost.
+        """
+        position = (ship.x, ship.y)
+        if position in self._structures:
+            return
+        cell_halite = self.halite[ship.y][ship.x]
+        cost = self.constants["DROPOFF_COST"] - ship.halite - cell_halite
+        if player.halite < cost:
+            return
+        player.halite -= cost
+        self._set_halite(ship.x, ship.y, 0)
+        del player.ships[ship.id]
+        player.dropoffs[self._next_dropoff_id] = position
+        self._structures[position] = player.id
+        self._next_dropoff_id += 1
+
+    def step(self, player_commands):
+        """
+        Apply the commands of every player for the current turn.
+        :param player_commands: For each player, in id order, its list of engine command strings
+        """
+        constants = self.constants
+        width, height = self.width, self.height
+        inspired = self._inspired()
+
+        moves = []
+        spawning = []
+        for player, player_orders in zip(self.players, player_commands):
+            ordered = set()
+            for command in player_orders:
+                parts = command.split()
+                if parts == [commands.GENERATE]:
+                    if player not in spawning:
+                        spawning.append(player)
+                    continue
+                if len(parts) < 2 or not parts[1].lstrip('-').isdigit():
+                    continue
+                ship = player.ships.get(int(parts[1]))
+                if ship is None or ship.id in ordered:
+                    continue
+                ordered.add(ship.id)
+                if parts[0] == commands.CONSTRUCT:
+                    self._construct(player, ship)
+                elif parts[0] == commands.MOVE and len(parts) == 3 and parts[2] in _OFFSETS:
+                    moves.append((ship, _OFFSETS[parts[2]]))
+
+        moved = set()
+        for ship, (dx, dy) in moves:
+            ratio = constants["INSPIRED_MOVE_COST_RATIO" if ship.id in inspired else "MOVE_COST_RATIO"]
+            cost = self.halite[ship.y][ship.x] // ratio
+            if ship.halite >= cost:
+                ship.halite -= cost
+                ship.x = (ship.x + dx) % width
+                ship.y = (ship.y + dy) % height
+                moved.add(ship.id)
+
+        spawned = set()
+        for player in spawning:
+            if player.halite >= constants["NEW_ENTITY_ENERGY_COST"]:
+                player.halite -= constants["NEW_ENTITY_ENERGY_COST"]
+                ship = _Ship(self._next_ship_id, player.id, *player.shipyard)
+                self._next_ship_id += 1
+                player.ships[ship.id] = ship
+                player.ships_built += 1
+                spawned.add(ship.id)
+
+        # Every ship ending on a shared cell is destroyed, dropping its cargo there
+        cells = collections.defaultdict(list)
+        for player in self.players:
+            for ship in player.ships.values():
+                cells[(ship.x, ship.y)].append(ship)
+        for (x, y), ships in cells.items():
+            if len(ships) < 2:
+                continue
+            dropped = 0
+            for ship in ships:
+                dropped += ship.halite
+                del self.players[ship.owner].ships[ship.id]
+            owner = self._structures.get((x, y))
+            if owner is not None:
+                self.players[owner].halite += dropped
+            elif dropped:
+                self._set_halite(x, y, self.halite[y][x] + dropped)
+
+        max_halite = constants["MAX_ENERGY"]
+        for player in self.players:
+            for ship in player.ships.values():
+                if ship.id in moved or ship.id in spawned:
+                    continue
+                is_inspired = ship.id in inspired
+                ratio = constants["INSPIRED_EXTRACT_RATIO" if is_inspired else "EXTRACT_RATIO"]
+                cell_halite = self.halite[ship.y][ship.x]
+                extracted = min(cell_halite // ratio, max_halite - ship.halite)
+                if extracted <= 0:
+                    continue
+                ship.halite += extracted
+                self._set_halite(ship.x, ship.y, cell_halite - extracted)
+                if is_inspired:
+                    ship.halite += min(int(extracted * constants["INSPIRED_BONUS_MULTIPLIER"]),
+                                       max_halite - ship.halite)
+
+        for player in self.players:
+            for ship in player.ships.values():
+                if self._structures.get((ship.x, ship.y)) == player.id:
+                    player.halite += ship.halite
+                    ship.halite = 0
+
+    def results(self):
+        """
+        :return: For each player, a dict of its final halite, ships built and ships alive, with its rank (1 is best)
+        """
+        ranking = sorted(self.players, key=lambda player: -player.halite)
+        return [{"id": player.id,
+                 "halite": player.halite,
+                 "ships_built": player.ships_built,
+                 "ships": len(player.ships),
+                 "dropoffs": len(player.dropoffs),
+                 "rank": ranking.index(player) + 1}
+                for player in self.players]
+
+
+def split_commands(line):
+    """
+    Split a line sent by a bot into its individual engine commands.
+    """
+    tokens = line.split()
+    result = []
+    index = 0
+    while index < len(tokens):
+        size = {commands.MOVE: 3, commands.CONSTRUCT: 2}.get(tokens[index], 1)
+        result.append(" ".join(tokens[index:index + size]))
+        index += size
+    return result
+
+
+class _FeedStream:
+    """
+    Binary line stream fed by the engine and read by a bot on the same thread.
+    """
+    def __init__(self):
+        self._lines = collections.deque()
+
+    def feed(self, text):
+        self._lines.extend(text.encode().splitlines(keepends=True))
+
+    def readline(self):
+        return self._lines.popleft() if self._lines else b""
+
+
+class _PipeStream:
+    """
+    Binary line stream fed by the engine and read by a bot on another thread; blocks until a line arrives.
+    """
+    def __init__(self):
+        self._lines = queue.Queue()
+
+    def feed(self, text):
+        for line in text.encode().splitlines(keepends=True):
+            self._lines.put(line)
+
+    def close(self):
+        self._lines.put(b"")
+
+    def readline(self):
+        line = self._lines.get()
+        if not line:
+            # Let every later read see the end of input too
+            self._lines.put(b"")
+        return line
+
+
+@contextlib.contextmanager
+def _redirected(input_stream, output):
+    previous = current_streams()
+    use_streams(input_stream, output)
+    try:
+        yield
+    finally:
+        use_streams(*previous)
+
+
+class FunctionBot:
+    """
+    A bot written as a function, run on the engine's thread with its own Game object.
+    """
+    def __init__(self, policy, name="FunctionBot"):
+        """
+        :param policy: A callable taking the updated Game each turn and returning its commands (a list or CommandBuilder)
+        :param name: The name of the bot
+        """
+        self.policy = policy
+        self.name = name
+        self.game = None
+        self._stream = None
+        self._input = None
+
+    def start(self, initial_input):
+        from hlt.hlt_networking import Game
+        self._stream = _FeedStream()
+        self._stream.feed(initial_input)
+        with _redirected(self._stream, lambda line: None):
+            self.game = Game()
+            # Game may have wrapped the stream, as it does to record it: keep reading through the wrapper
+            self._input = current_streams()[0]
+        return self.name
+
+    def play(self, frame_input):
+        """
+        :return: The commands of the bot for this frame
+        """
+        self._stream.feed(frame_input)
+        # Function bots share the engine's thread: intern positions on this bot's map
+        self.game.game_map.positions.activate()
+        with _redirected(self._input, lambda line: None):
+            self.game.update_frame()
+            return list(self.policy(self.game))
+
+    def stop(self):
+        pass
+
+
+class _ScriptEnd:
+    """
+    Sent by a ScriptBot's thread once its script has returned, with the exception that ended it, if any.
+    """
+    def __init__(self, error=None):
+        self.error = error
+
+
+class ScriptBot:
+    """
+    A bot script, such as MyBot.py, run on its own thread as if it were its own process.
+
+    Like the official engine, a bot whose script raises, exits before the end of the game, or answers late is
+    out of the game: it is no longer fed, sends no commands for the remaining turns, and error says why.
+    """
+    def __init__(self, path, timeout=None, settings=None):
+        """
+        :param path: The path of the bot script
+        :param timeout: Seconds to wait for each answer, None to wait forever; the name may take INITIAL_TIMEOUT
+        :param settings: A dict the script finds in its BOT_SETTINGS global, to override its tuning constants
+        """
+        self.path = os.path.abspath(path)
+        self.timeout = timeout
+        self.settings = settings
+        self.name = os.path.basename(path)
+        self.error = None
+        self._input = None
+        self._output = None
+        self._thread = None
+
+    def _run(self):
+        use_streams(self._input, self._output.put)
+        try:
+            run_script(self.path, {"BOT_SETTINGS": self.settings} if self.settings else None)
+        except BaseException as error:
+            self._output.put(_ScriptEnd(error))
+        else:
+            self._output.put(_ScriptEnd())
+
+    def _answer(self, timeout):
+        """
+        :param timeout: Seconds to wait, None to wait forever
+        :return: The next line sent by the script, None if it is out of the game
+        """
+        if self.error is not None:
+            return None
+        try:
+            answer = self._output.get(timeout=timeout)
+        except queue.Empty:
+            self.error = "no answer within {}s".format(timeout)
+            return None
+        if isinstance(answer, _ScriptEnd):
+            self.error = "exited" if answer.error is None else "raised {!r}".format(answer.error)
+            return None
+        return answer
+
+    def start(self, initial_input):
+        script_directory = os.path.dirname(self.path)
+        if script_directory not in sys.path:
+            sys.path.insert(0, script_directory)
+        self.error = None
+        self._input = _PipeStream()
+        self._output = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._input.feed(initial_input)
+        self._thread.start()
+        initial_timeout = None if self.timeout is None else max(self.timeout, INITIAL_TIMEOUT)
+        self.name = self._answer(initial_timeout) or self.name
+        return self.name
+
+    def play(self, frame_input):
+        if self.error is not None:
+            return []
+        self._input.feed(frame_input)
+        answer = self._answer(self.timeout)
+        return [] if answer is None else split_commands(answer)
+
+    def stop(self):
+        self._input.close()
+        self._thread.join(self.timeout)
+
+
+def run_game(bots, width=32, height=32, seed=0, game_constants=None):
+    """
+    Play one game in-process.
+    :param bots: One FunctionBot or ScriptBot per player, 2 or 4 of them
+    :param width: The map width
+    :param height: The map height
+    :param seed: The map seed
+    :param game_constants: Constants overriding the engine defaults
+    :return: A dict describing the game, with per player results, per turn answer times in seconds and the error
+        that put the player's ScriptBot out of the game, None if it played to the end
+    """
+    engine = HaliteEngine(len(bots), width, height, seed, game_constants)
+    names = [bot.start(engine.initial_input(player_id)) for player_id, bot in enumerate(bots)]
+    turn_times = [[] for _ in bots]
+    try:
+        while not engine.is_over():
+            frame = engine.frame_input()
+            player_commands = []
+            for player_id, bot in enumerate(bots):
+                started = time.perf_counter()
+                player_commands.append(bot.play(frame))
+                turn_times[player_id].append(time.perf_counter() - started)
+            engine.step(player_commands)
+    finally:
+        for bot in bots:
+            bot.stop()
+
+    results = engine.results()
+    for result, name, times, bot in zip(results, names, turn_times, bots):
+        result["name"] = name
+        result["turn_times"] = times
+        result["error"] = getattr(bot, "error", None)
+    return {"seed": seed, "width": width, "height": height, "turns": engine.turn, "players": results}
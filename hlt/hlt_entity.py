@@ -11,6 +11,8 @@ class Entity(abc.ABC):
     """
     Base Entity Class from whence Ships, Dropoffs and Shipyards inherit
     """
+    __slots__ = ('owner', 'id', 'position')
+
     def __init__(self, owner, id, position):
         self.owner = owner
         self.id = id
@@ -26,6 +28,15 @@ class Entity(abc.ABC):
         ship_id, x_position, y_position = map(int, read_input().split())
         return ship_id, Entity(player_id, ship_id, Position(x_position, y_position))
 
+    @classmethod
+    def _from_values(cls, player_id, entity_id, x_position, y_position):
+        """
+        Creates an entity of this class from values already decoded from the engine's input.
+        :param player_id: The player id for the player who owns this entity
+        :return: The entity id and the entity
+        """
+        return entity_id, cls(player_id, entity_id, Position(x_position, y_position))
+
     def __repr__(self):
         return "{}(id={}, {})".format(self.__class__.__name__,
                                       self.id,
@@ -42,13 +53,15 @@ class Dropoff(Entity):
     """
     Dropoff class for housing dropoffs
     """
-    pass
+    __slots__ = ()
 
 
 class Shipyard(Entity):
     """
     Shipyard class to house shipyards
     """
+    __slots__ = ()
+
     def spawn(self):
         """Return a move to spawn a new ship."""
         return commands.GENERATE
@@ -58,7 +71,7 @@ class Ship(Entity):
     """
     Ship class to house ship entities
     """
-    __ships = {}
+    __slots__ = ('halite_amount',)
 
     def __init__(self, owner, id, position, halite_amount):
         super().__init__(owner, id, position)
@@ -90,28 +103,37 @@ class Ship(Entity):
         return "{} {} {}".format(commands.MOVE, self.id, commands.STAY_STILL)
 
     @staticmethod
-    def _generate(player_id):
+    def _generate(player_id, ships=None):
         """
         Creates an instance of a ship for a given player given the engine's input.
-        If an instance with the same ship.id has previously been generated, that instance will be returned.
+        If the ship is already in ships, that instance is updated and returned.
         :param player_id: The id of the player who owns this ship
+        :param ships: The dict of ship id to ship of the player, where new ships are added
         :return: The ship id and ship object
         """
         # Read game engine input
         ship_id, x_position, y_position, halite = map(int, read_input().split())
+        return Ship._from_values(player_id, ship_id, x_position, y_position, halite, ships)
 
-        # Check storage to see if ship already exists
-        # If the ship exists, update its position and halite
-        if ship_id in Ship.__ships.keys():    
-            old_ship = Ship.__ships[ship_id]
-            old_ship.position = Position(x_position, y_position)
-            old_ship.halite_amount = halite
-            return ship_id, old_ship
-        else:
-            # Otherwise, create and return a new instance
-            new_ship = Ship(player_id, ship_id, Position(x_position, y_position), halite)
-            Ship.__ships[ship_id] = new_ship
-            return ship_id, new_ship
+    @staticmethod
+    def _from_values(player_id, ship_id, x_position, y_position, halite, ships=None):
+        """
+        Same as _generate, from values already decoded from the engine's input.
+        :param player_id: The id of the player who owns this ship
+        :param ships: The dict of ship id to ship of the player, where new ships are added
+        :return: The ship id and ship object
+        """
+        # If the ship exists, update its position and halite in place
+        ship = ships.get(ship_id) if ships is not None else None
+        if ship is not None:
+            ship.position = Position(x_position, y_position)
+            ship.halite_amount = halite
+            return ship_id, ship
+        # Otherwise, create and store a new instance
+        ship = Ship(player_id, ship_id, Position(x_position, y_position), halite)
+        if ships is not None:
+            ships[ship_id] = ship
+        return ship_id, ship
 
     def __repr__(self):
         return "{}(id={}, {}, cargo={} halite)".format(self.__class__.__name__,
@@ -1,20 +1,45 @@
 import queue
 
+import numpy as np
+
 import hlt.hlt_constants as constants
 from hlt.hlt_entity import Entity, Shipyard, Ship, Dropoff
 from hlt.hlt_player import Player
-from hlt.hlt_positionals import Direction, Position
+from hlt.hlt_positionals import Direction, Position, PositionPool
 from hlt.hlt_common import read_input
+from hlt.hlt_assignment import min_cost_assignment
+from hlt.hlt_distances import DistanceTable
+from hlt.hlt_halite_index import HaliteIndex
+from hlt.hlt_inspiration import InspirationMap
+from hlt.hlt_occupancy import OccupancyIndex
+from hlt.hlt_profiling import timed
+from hlt.hlt_summed_area import SummedAreaTable
+
 
+def _neighbour_array(width, height):
+    """
+    :return: A (width * height, 4) int32 array of the flat indices of the north, south, east and west neighbours
+        of every flat cell index
+    """
+    xs = np.tile(np.arange(width), height)
+    ys = np.repeat(np.arange(height), width)
+    return np.stack([((ys - 1) % height) * width + xs,
+                     ((ys + 1) % height) * width + xs,
+                     ys * width + (xs + 1) % width,
+                     ys * width + (xs - 1) % width], axis=1).astype(np.int32)
 
 
 class MapCell:
     """A cell on the game map."""
+    __slots__ = ('position', 'halite_amount', 'ship', 'structure', '_marked_cells')
+
     def __init__(self, position, halite_amount):
         self.position = position
         self.halite_amount = halite_amount
         self.ship = None
         self.structure = None
+        # The owning map's list of marked cells, cleared on the next update
+        self._marked_cells = None
 
     @property
     def is_empty(self):
@@ -50,6 +75,8 @@ class MapCell:
 
         Use in conjunction with GameMap.naive_navigate.
         """
+        if self.ship is None and self._marked_cells is not None:
+            self._marked_cells.append(self)
         self.ship = ship
 
     def __eq__(self, other):
@@ -68,11 +95,43 @@ class GameMap:
 
     Can be indexed by a position, or by a contained entity.
     Coordinates start at 0. Coordinates are normalized for you
+
+    The engine state is mirrored into NumPy arrays indexed [y, x] for whole-map queries:
+    halite_array holds the halite per cell, ship_owners and structure_owners the owning
+    player id of the ship or structure on each cell (-1 when there is none).
+    halite_sums answers square window sums and means of halite_array in O(1), and halite_index
+    finds the richest cells around a position.
+
+    Cells also have a flat index, y * width + x: neighbours holds the flat indices of the cardinal neighbours of
+    each cell, in Direction.get_all_cardinals order, so searches can run over integer arrays.
+
+    The map owns the PositionPool of its cells and activates it, so positions on this map are interned.
+
+    Updates only touch the cells marked since the previous turn and the cells the engine reports;
+    the latter are listed in changed_cells for the current turn. version counts the updates, for the per
+    turn caches kept outside the map.
     """
-    def __init__(self, cells, width, height):
+    def __init__(self, cells, width, height, positions=None):
         self.width = width
         self.height = height
         self._cells = cells
+        self.positions = positions if positions is not None else PositionPool(width, height)
+        self.positions.activate()
+        self.changed_cells = []
+        self.version = 0
+        self._marked_cells = []
+        for row in cells:
+            for cell in row:
+                cell._marked_cells = self._marked_cells
+        self.halite_array = np.array([[cell.halite_amount for cell in row] for row in cells], dtype=np.int32)
+        self.ship_owners = np.full((height, width), -1, dtype=np.int32)
+        self.structure_owners = np.full((height, width), -1, dtype=np.int32)
+        self.halite_sums = SummedAreaTable(self.halite_array)
+        self.distances = DistanceTable(width, height)
+        self.neighbours = _neighbour_array(width, height)
+        self.occupancy = OccupancyIndex(self.positions, self.distances)
+        self.halite_index = HaliteIndex(self)
+        self._inspiration = {}
 
     def __getitem__(self, location):
         """
@@ -87,6 +146,34 @@ class GameMap:
             return self._cells[location.position.y][location.position.x]
         return None
 
+    def cell_index(self, position):
+        """
+        :return: The flat index of the cell of a position
+        """
+        return (position.y % self.height) * self.width + position.x % self.width
+
+    def cell_indices(self, positions):
+        """
+        :param positions: An iterable of positions, or a tuple of (xs, ys) arrays
+        :return: An int array of the flat indices of their cells
+        """
+        xs, ys = self.distances.coordinates(positions)
+        return ys * self.width + xs
+
+    def index_position(self, index):
+        """
+        :return: The position of the cell of a flat index
+        """
+        return self.positions.get(index % self.width, index // self.width)
+
+    def index_coordinates(self, indices):
+        """
+        :param indices: An int array of flat indices
+        :return: A tuple of the x and y int arrays of their cells
+        """
+        ys, xs = np.divmod(np.asarray(indices, dtype=np.int64), self.width)
+        return xs, ys
+
     def calculate_distance(self, source, target):
         """
         Compute the Manhattan distance between two locations.
@@ -95,11 +182,7 @@ class GameMap:
         :param target: The target to where calculate
         :return: The distance between these items
         """
-        source = self.normalize(source)
-        target = self.normalize(target)
-        resulting_position = abs(source - target)
-        return min(resulting_position.x, self.width - resulting_position.x) + \
-            min(resulting_position.y, self.height - resulting_position.y)
+        return self.distances.distance(source, target)
 
     def normalize(self, position):
         """
@@ -110,7 +193,82 @@ class GameMap:
         :param position: A position object.
         :return: A normalized position object fitting within the bounds of the map
         """
-        return Position(position.x % self.width, position.y % self.height)
+        return self.positions.get(position.x, position.y)
+
+    def total_halite(self):
+        """
+        :return: The amount of halite left on the whole map
+        """
+        return int(self.halite_array.sum(dtype=np.int64))
+
+    def halite_mask(self, threshold):
+        """
+        :param threshold: The minimum amount of halite
+        :return: A boolean array indexed [y, x], True where a cell holds at least threshold halite
+        """
+        return self.halite_array >= threshold
+
+    def halite_sum(self, mask=None):
+        """
+        Sum the halite of the cells selected by a boolean mask.
+        :param mask: A boolean array indexed [y, x], or None for the whole map
+        :return: The amount of halite in the selected cells
+        """
+        if mask is None:
+            return self.total_halite()
+        return int(self.halite_array[mask].sum(dtype=np.int64))
+
+    def _window_indices(self, center, radius):
+        """
+        :return: The wrapped row and column indices of the square window of the given radius around center
+        """
+        offsets = np.arange(-radius, radius + 1)
+        rows = (center.y + offsets) % self.height
+        cols = (center.x + offsets) % self.width
+        return rows, cols
+
+    def window_argmax(self, center, radius):
+        """
+        Find the richest cell in the square window of the given radius around center.
+        Accounts for wrap-around.
+        :param center: The position at the center of the window
+        :param radius: The half size of the window
+        :return: A tuple of the richest position and its halite amount
+        """
+        rows, cols = self._window_indices(center, radius)
+        window = self.halite_array[np.ix_(rows, cols)]
+        y, x = np.unravel_index(int(np.argmax(window)), window.shape)
+        return Position(int(cols[x]), int(rows[y])), int(window[y, x])
+
+    def inspiration(self, player_id):
+        """
+        Compute (once per turn) which cells are inspired for a player, from the ships on the map.
+        :param player_id: The player whose ships would be inspired
+        :return: An InspirationMap
+        """
+        inspiration = self._inspiration.get(player_id)
+        if inspiration is None:
+            inspiration = InspirationMap(self.ship_owners, self.halite_array, player_id)
+            self._inspiration[player_id] = inspiration
+        return inspiration
+
+    def _mark_ship(self, ship):
+        """
+        Mark the cell of a ship read from the engine as occupied.
+        :param ship: The ship to mark
+        """
+        self[ship.position].mark_unsafe(ship)
+        self.ship_owners[ship.position.y, ship.position.x] = ship.owner
+        self.occupancy.add_ship(ship)
+
+    def _mark_structure(self, structure):
+        """
+        Place a shipyard or dropoff read from the engine on its cell.
+        :param structure: The structure to place
+        """
+        self[structure.position].structure = structure
+        self.structure_owners[structure.position.y, structure.position.x] = structure.owner
+        self.occupancy.add_structure(structure)
 
     @staticmethod
     def _get_target_direction(source, target):
@@ -165,6 +323,44 @@ class GameMap:
 
         return Direction.Still
 
+    def assign_moves(self, ships, preferences, blocked=(), still_cost=None):
+        """
+        Choose the moves of a whole fleet at once so that no two ships end on the same cell.
+
+        The moves are a min-cost matching of ships to destination cells over their one-move options.
+        Staying still is always an option, so a collision-free assignment always exists; swapping cells is allowed.
+        :param ships: The ships to move
+        :param preferences: Maps each ship id to either a list of Directions, best first (the cost of a move
+            is its rank), or a dict of Direction to non-negative cost. Ships without preferences stay still.
+        :param blocked: Positions no ship may move onto, e.g. cells next to enemy ships
+        :param still_cost: Cost of staying still when not listed in a ship's preferences,
+            defaults to one more than its worst listed move
+        :return: A dict of ship id to the Direction assigned to it
+        """
+        blocked = {self.normalize(position) for position in blocked}
+        options = []
+        for ship in ships:
+            ranked = preferences.get(ship.id, ())
+            costs = ranked if isinstance(ranked, dict) else {direction: rank for rank, direction in enumerate(ranked)}
+            ship_options = []
+            for direction, cost in costs.items():
+                destination = ship.position.directional_offset(direction)
+                if direction == Direction.Still or destination not in blocked:
+                    ship_options.append((cost, destination))
+            if Direction.Still not in costs:
+                cost = still_cost if still_cost is not None else max(costs.values(), default=-1) + 1
+                ship_options.append((cost, ship.position))
+            options.append(ship_options)
+
+        destinations = min_cost_assignment(options)
+        moves = {}
+        for ship, destination in zip(ships, destinations):
+            for direction in [Direction.Still] + Direction.get_all_cardinals():
+                if ship.position.directional_offset(direction) == destination:
+                    moves[ship.id] = direction
+                    break
+        return moves
+
     @staticmethod
     def _generate():
         """
@@ -172,26 +368,49 @@ class GameMap:
         :return: The map object
         """
         map_width, map_height = map(int, read_input().split())
+        positions = PositionPool(map_width, map_height)
         game_map = [[None for _ in range(map_width)] for _ in range(map_height)]
         for y_position in range(map_height):
             cells = read_input().split()
             for x_position in range(map_width):
-                game_map[y_position][x_position] = MapCell(Position(x_position, y_position,
-                                                                    normalize=False),
+                game_map[y_position][x_position] = MapCell(positions.get(x_position, y_position),
                                                            int(cells[x_position]))
-        return GameMap(game_map, map_width, map_height)
+        return GameMap(game_map, map_width, map_height, positions)
 
-    def _update(self):
+    @timed("map_update")
+    def _update(self, cell_values=None):
         """
         Updates this map object from the input given by the game engine
+        :param cell_values: The decoded cell update section of the frame (count, then x y halite per cell),
+            if already read, else it is read from input
         :return: nothing
         """
         # Mark cells as safe for navigation (will re-mark unsafe cells
         # later)
-        for y in range(self.height):
-            for x in range(self.width):
-                self[Position(x, y)].ship = None
+        for cell in self._marked_cells:
+            cell.ship = None
+            self.ship_owners[cell.position.y, cell.position.x] = -1
+        self._marked_cells.clear()
+        self.occupancy.clear()
+        self._inspiration.clear()
+        self.version += 1
+
+        self.changed_cells = []
+        if cell_values is None:
+            for _ in range(int(read_input())):
+                cell_x, cell_y, cell_energy = map(int, read_input().split())
+                cell = self._cells[cell_y][cell_x]
+                cell.halite_amount = cell_energy
+                self.halite_array[cell_y, cell_x] = cell_energy
+                self.changed_cells.append(cell)
+        else:
+            updates = np.asarray(cell_values[1:1 + 3 * int(cell_values[0])]).reshape(-1, 3)
+            self.halite_array[updates[:, 1], updates[:, 0]] = updates[:, 2]
+            for cell_x, cell_y, cell_energy in updates.tolist():
+                cell = self._cells[cell_y][cell_x]
+                cell.halite_amount = cell_energy
+                self.changed_cells.append(cell)
 
-        for _ in range(int(read_input())):
-            cell_x, cell_y, cell_energy = map(int, read_input().split())
-            self[Position(cell_x, cell_y)].halite_amount = cell_energy
+        if self.changed_cells:
+            self.halite_sums.invalidate()
+            self.halite_index.update(self.changed_cells)
@@ -0,0 +1,138 @@
+import heapq
+
+
+class HaliteIndex:
+    """
+    Halite-ranked index of the cells of a map.
+
+    A max-heap holds (halite, cell) entries and is kept up to date from the map's per-turn cell deltas
+    with lazy invalidation: a changed cell gets a fresh entry and stale entries are dropped when they
+    surface. Cells are identified by their flat index y * width + x.
+    """
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.width = game_map.width
+        self.height = game_map.height
+        self._halite = game_map.halite_array.ravel().tolist()
+        self._heap = [(-halite, index) for index, halite in enumerate(self._halite)]
+        heapq.heapify(self._heap)
+        self._rings = {}
+
+    def update(self, cells):
+        """
+        Record the new halite amount of changed cells.
+        :param cells: The MapCells changed this turn
+        """
+        width = self.width
+        for cell in cells:
+            index = cell.position.y * width + cell.position.x
+            self._halite[index] = cell.halite_amount
+            heapq.heappush(self._heap, (-cell.halite_amount, index))
+        # Rebuild once stale entries dominate, so the heap does not grow without bound
+        if len(self._heap) > 4 * len(self._halite):
+            self._heap = [(-halite, index) for index, halite in enumerate(self._halite)]
+            heapq.heapify(self._heap)
+
+    def _position(self, index):
+        return self.game_map.positions.get(index % self.width, index // self.width)
+
+    def _prune(self):
+        """
+        Drop stale entries from the top of the heap.
+        """
+        heap = self._heap
+        halite = self._halite
+        while heap and -heap[0][0] != halite[heap[0][1]]:
+            heapq.heappop(heap)
+
+    def max_halite(self):
+        """
+        :return: The largest amount of halite on a single cell of the map
+        """
+        self._prune()
+        return -self._heap[0][0] if self._heap else 0
+
+    def top(self, k, claimed=()):
+        """
+        Return the richest cells of the whole map.
+        :param k: The number of cells to return
+        :param claimed: Positions to skip
+        :return: A list of up to k (position, halite) tuples, richest first
+        """
+        claimed = {(position.y % self.height) * self.width + position.x % self.width for position in claimed}
+        heap = self._heap
+        halite = self._halite
+        popped = []
+        result = []
+        while heap and len(result) < k:
+            entry = heapq.heappop(heap)
+            amount, index = -entry[0], entry[1]
+            if amount != halite[index]:
+                continue
+            popped.append(entry)
+            if index not in claimed:
+                result.append((self._position(index), amount))
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return result
+
+    def _ring(self, distance):
+        """
+        :return: The (dx, dy) offsets of the cells at exactly the given Manhattan distance
+        """
+        ring = self._rings.get(distance)
+        if ring is None:
+            if distance == 0:
+                ring = [(0, 0)]
+            else:
+                ring = [(dx, sign * (distance - abs(dx)))
+                        for dx in range(-distance, distance + 1)
+                        for sign in ((1,) if abs(dx) == distance else (1, -1))]
+            self._rings[distance] = ring
+        return ring
+
+    def best_within(self, center, radius, k=1, claimed=(), distance_weight=0):
+        """
+        Return the best cells within a Manhattan distance of center.
+
+        Cells are scored by halite - distance_weight * distance and searched ring by ring outward in all four
+        directions. The search stops early once no further ring can beat the k-th best cell found, since
+        no cell holds more halite than the richest cell of the map.
+        :param center: The position to search around
+        :param radius: The maximum distance, inclusive
+        :param k: The number of cells to return
+        :param claimed: Positions to skip, e.g. the targets of other ships
+        :param distance_weight: Halite subtracted from the score per unit of distance
+        :return: A list of up to k (position, halite) tuples, best first
+        """
+        width = self.width
+        height = self.height
+        halite = self._halite
+        claimed = {(position.y % height) * width + position.x % width for position in claimed}
+        radius = min(radius, width // 2 + height // 2)
+        upper_bound = self.max_halite()
+
+        # Rings overlap once they wrap around the map, each cell is then only scored at its first (shortest) distance
+        seen = set() if 2 * radius >= min(width, height) else None
+        best = []
+        order = 0
+        for distance in range(radius + 1):
+            for dx, dy in self._ring(distance):
+                index = ((center.y + dy) % height) * width + (center.x + dx) % width
+                if index in claimed:
+                    continue
+                if seen is not None:
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                score = halite[index] - distance_weight * distance
+                order += 1
+                entry = (score, -order, index)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            if len(best) == k and best[0][0] >= upper_bound - distance_weight * (distance + 1):
+                break
+
+        return [(self._position(index), halite[index]) for _, _, index in sorted(best, reverse=True)]
@@ -0,0 +1,67 @@
+import numpy as np
+
+import hlt.hlt_constants as constants
+
+
+class InspirationMap:
+    """
+    Which cells of the map are inspired for a player, computed for a whole turn at once.
+
+    The number of enemy ships within INSPIRATION_RADIUS of every cell is the toroidal convolution of the
+    enemy ship occupancy with a Manhattan diamond, done with FFTs. Arrays are indexed [y, x].
+    """
+    _kernel_spectra = {}
+
+    def __init__(self, ship_owners, halite, player_id):
+        """
+        :param ship_owners: The [y, x] array of the id of the player owning the ship on each cell, -1 if none
+        :param halite: The [y, x] array of halite on each cell
+        :param player_id: The player for whom enemies are counted
+        """
+        enemies = ((ship_owners >= 0) & (ship_owners != player_id)).astype(np.float64)
+        spectrum = self._kernel_spectrum(enemies.shape, constants.INSPIRATION_RADIUS)
+        counts = np.fft.irfft2(np.fft.rfft2(enemies) * spectrum, s=enemies.shape)
+
+        # Number of enemy ships in range, whether a ship would be inspired, and the fraction of the
+        # cell's halite a ship mining there collects in a turn (bonus included), per cell
+        self.enemy_counts = np.rint(counts).astype(np.int32)
+        self.inspired = self.enemy_counts >= constants.INSPIRATION_SHIP_COUNT
+        if not constants.INSPIRATION_ENABLED:
+            self.inspired[:] = False
+        self.extraction_rates = np.where(self.inspired,
+                                         (1 + constants.INSPIRED_BONUS_MULTIPLIER) / constants.INSPIRED_EXTRACT_RATIO,
+                                         1 / constants.EXTRACT_RATIO)
+        self._halite = halite
+
+    @classmethod
+    def _kernel_spectrum(cls, shape, radius):
+        """
+        :return: The cached real FFT of the Manhattan diamond of the given radius, centered on cell (0, 0)
+        """
+        key = (shape, radius)
+        spectrum = cls._kernel_spectra.get(key)
+        if spectrum is None:
+            height, width = shape
+            dy = np.minimum(np.arange(height), height - np.arange(height))
+            dx = np.minimum(np.arange(width), width - np.arange(width))
+            kernel = (dy[:, None] + dx[None, :] <= radius).astype(np.float64)
+            spectrum = np.fft.rfft2(kernel)
+            cls._kernel_spectra[key] = spectrum
+        return spectrum
+
+    def mining_yields(self):
+        """
+        :return: The halite a ship mining each cell would collect this turn, inspiration bonus included
+        """
+        halite = self._halite
+        extracted = np.where(self.inspired,
+                             halite // constants.INSPIRED_EXTRACT_RATIO,
+                             halite // constants.EXTRACT_RATIO)
+        bonus = np.where(self.inspired, extracted * constants.INSPIRED_BONUS_MULTIPLIER, 0)
+        return (extracted + bonus).astype(np.int64)
+
+    def is_inspired(self, position):
+        """
+        :return: Whether a ship at position would be inspired
+        """
+        return bool(self.inspired[position.y, position.x])
@@ -0,0 +1,212 @@
+"""
+Logging setup of a bot, writing bot-<id>.log in one of several modes:
+
+    sync   records are formatted and written on the bot's thread, as logging.basicConfig does
+    async  records are queued unformatted to a writer thread, which formats and writes them
+    ring   the last records are kept unformatted in memory and written on an error record or at exit
+    off    nothing is logged
+
+Records below WARNING can also be sampled, keeping them only every N turns. Records are gated by level
+before their message is formatted, so log with lazy arguments (logging.debug("%s", value)). In the async
+and ring modes the arguments are formatted later, on another thread or at exit: pass values that will not
+change in the meantime.
+
+Several bots may run in one process, each on its own thread, as hlt_engine runs them: the root logger then
+routes each record to the log of the bot whose thread logged it.
+"""
+import collections
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+"""Environment variables overriding the mode, level and sampling of the log."""
+MODE_ENVIRONMENT_VARIABLE = "HALITE_LOG"
+LEVEL_ENVIRONMENT_VARIABLE = "HALITE_LOG_LEVEL"
+EVERY_ENVIRONMENT_VARIABLE = "HALITE_LOG_EVERY"
+
+LOG_MODES = ("sync", "async", "ring", "off")
+
+"""Records kept by the ring mode."""
+DEFAULT_RING_SIZE = 10000
+
+
+class TurnSampler(logging.Filter):
+    """
+    Keeps records below WARNING only on turns that are a multiple of every. Game sets the turn.
+    """
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+        self.turn = 0
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.turn % self.every == 0
+
+
+class AsyncHandler(QueueHandler):
+    """
+    Hands records to a writer thread without formatting them. Closing it, as logging.shutdown does when the
+    engine closes the input, writes the records still queued.
+    """
+    def __init__(self, handler):
+        """
+        :param handler: The handler writing the records, run on the writer thread
+        """
+        super().__init__(queue.SimpleQueue())
+        self._handler = handler
+        self._listener = QueueListener(self.queue, handler)
+        self._listener.start()
+
+    def prepare(self, record):
+        # Formatting is left to the writer thread
+        return record
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            self._handler.close()
+        super().close()
+
+
+class RingHandler(logging.Handler):
+    """
+    Keeps the last records unformatted in memory, writing them through a target handler when a record
+    reaches ERROR and when flushed or closed, which logging.shutdown does at exit.
+    """
+    def __init__(self, target, capacity=DEFAULT_RING_SIZE):
+        """
+        :param target: The handler writing the records
+        :param capacity: The number of records kept
+        """
+        super().__init__()
+        self._target = target
+        self._records = collections.deque(maxlen=capacity)
+
+    def emit(self, record):
+        self._records.append(record)
+        if record.levelno >= logging.ERROR:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            while self._records:
+                self._target.handle(self._records.popleft())
+            self._target.flush()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        self._target.close()
+        super().close()
+
+
+class BotRouter(logging.Handler):
+    """
+    The root handler of the bots of a process: hands each record to the handler of the bot whose thread logged
+    it. Records of threads without a bot go to the first bot set up.
+    """
+    def __init__(self):
+        super().__init__()
+        self._handlers = {}
+        self._first = None
+        self._local = threading.local()
+
+    def add(self, player_id, handler):
+        """
+        Route the records of the current thread to a bot's handler, replacing the bot's previous one.
+        :param player_id: The id of the bot
+        :param handler: The handler of the bot, None to drop its records
+        """
+        previous = self._handlers.get(player_id)
+        if previous is not None:
+            previous.close()
+        self._handlers[player_id] = handler
+        self._local.player_id = player_id
+        if self._first is None:
+            self._first = player_id
+
+    def lowest_level(self):
+        """
+        :return: The lowest level a bot logs, above CRITICAL if none logs
+        """
+        levels = [handler.level for handler in self._handlers.values() if handler is not None]
+        return min(levels) if levels else logging.CRITICAL + 1
+
+    def handle(self, record):
+        # The bot handlers lock and filter for themselves
+        handler = self._handlers.get(getattr(self._local, 'player_id', self._first))
+        if handler is not None:
+            handler.handle(record)
+        return True
+
+    def flush(self):
+        for handler in list(self._handlers.values()):
+            if handler is not None:
+                handler.flush()
+
+    def close(self):
+        for handler in list(self._handlers.values()):
+            if handler is not None:
+                handler.close()
+        super().close()
+
+
+def _parse_level(level):
+    """
+    :return: The number of a level given as a number, a digit string or a name
+    """
+    if isinstance(level, str):
+        level = int(level) if level.isdigit() else logging.getLevelName(level.upper())
+    if not isinstance(level, int):
+        raise ValueError("Unknown log level {}".format(level))
+    return level
+
+
+def setup_logging(player_id, mode=None, level=None, every=None):
+    """
+    Configure the root logger for a bot, unless it already has handlers of its own, like logging.basicConfig.
+    A bot set up again, e.g. for a new game in the same process, replaces its previous log.
+    :param player_id: The id of the bot, naming its log file
+    :param mode: One of LOG_MODES, defaults to the HALITE_LOG environment variable, else sync
+    :param level: The lowest level logged, a name or a number; defaults to HALITE_LOG_LEVEL, else DEBUG
+    :param every: Keep records below WARNING every this many turns; defaults to HALITE_LOG_EVERY, else 1
+    :return: The TurnSampler to give the turn number to, None if records are not sampled
+    """
+    root = logging.getLogger()
+    router = next((handler for handler in root.handlers if isinstance(handler, BotRouter)), None)
+    if router is None:
+        if root.handlers:
+            return None
+        router = BotRouter()
+        root.addHandler(router)
+    mode = mode or os.environ.get(MODE_ENVIRONMENT_VARIABLE, "sync")
+    level = _parse_level(level or os.environ.get(LEVEL_ENVIRONMENT_VARIABLE, logging.DEBUG))
+    every = int(every or os.environ.get(EVERY_ENVIRONMENT_VARIABLE, 1))
+    if mode not in LOG_MODES:
+        raise ValueError("Unknown log mode {}, expected one of {}".format(mode, ", ".join(LOG_MODES)))
+
+    sampler = None
+    if mode == "off":
+        handler = None
+    else:
+        # The ring mode creates its file only if it ever writes to it
+        file_handler = logging.FileHandler("bot-{}.log".format(player_id), mode="w", delay=mode == "ring")
+        file_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        if mode == "async":
+            handler = AsyncHandler(file_handler)
+        elif mode == "ring":
+            handler = RingHandler(file_handler)
+        else:
+            handler = file_handler
+        handler.setLevel(level)
+        if every > 1:
+            sampler = TurnSampler(every)
+            handler.addFilter(sampler)
+    router.add(player_id, handler)
+    root.setLevel(router.lowest_level())
+    return sampler
@@ -1,21 +1,50 @@
 import json
 import logging
-import sys
+import os
+import time
+from types import MappingProxyType
 
-from hlt.hlt_common import read_input
+from hlt.hlt_common import read_input, write_output, FrameReader
 import hlt.hlt_constants as constants
 from hlt.hlt_game_map import GameMap, Player
+from hlt.hlt_logging import setup_logging
+from hlt.hlt_profiling import TurnProfiler, active_profiler, PROFILE_ENVIRONMENT_VARIABLE
+from hlt.hlt_recording import InputRecorder, RECORD_ENVIRONMENT_VARIABLE
+from hlt.hlt_return_field import ReturnField
+from hlt.hlt_ship_table import ShipTable
+from hlt.hlt_turn_budget import TurnBudget, DEFAULT_TURN_TIME_LIMIT, DEFAULT_SAFETY_MARGIN
+from hlt.hlt_turn_cache import TurnCache, turn_cached
 
 class Game:
     """
     The game object holds all metadata pertinent to the game and all its contents
     """
-    def __init__(self):
+    def __init__(self, turn_time_limit=DEFAULT_TURN_TIME_LIMIT, safety_margin=DEFAULT_SAFETY_MARGIN,
+                 record_path=None, profile_path=None, log_mode=None, log_level=None, log_every=None):
         """
         Initiates a game object collecting all start-state instances for the contained items for pre-game.
-        Also sets up basic logging.
+        Also sets up logging, see hlt_logging.
+        :param turn_time_limit: The engine's per turn time limit, in seconds
+        :param safety_margin: The time kept in reserve to send the commands, in seconds
+        :param record_path: A file to record the engine input into for hlt_recording, "{id}" being replaced by
+            the player id; defaults to the HALITE_RECORD environment variable, no recording if unset
+        :param profile_path: A file to dump the hlt_profiling summary into at the end of the game, "{id}" being
+            replaced by the player id; defaults to the HALITE_PROFILE environment variable, no profiling if unset
+        :param log_mode: How bot-<id>.log is written, one of hlt_logging.LOG_MODES; defaults to HALITE_LOG, else sync
+        :param log_level: The lowest level logged; defaults to HALITE_LOG_LEVEL, else DEBUG
+        :param log_every: Log below WARNING only every this many turns; defaults to HALITE_LOG_EVERY, else 1
         """
         self.turn_number = 0
+        self._cache = TurnCache()
+        self.budget = TurnBudget(turn_time_limit, safety_margin)
+        self._frame_reader = FrameReader()
+        record_path = record_path or os.environ.get(RECORD_ENVIRONMENT_VARIABLE)
+        self._recorder = InputRecorder.install() if record_path else None
+        self._profile_path = profile_path or os.environ.get(PROFILE_ENVIRONMENT_VARIABLE)
+        self.profiler = None
+        if self._profile_path:
+            self.profiler = TurnProfiler()
+            self.profiler.activate()
 
         # Grab constants JSON
         raw_constants = read_input()
@@ -23,20 +52,27 @@ class Game:
 
         num_players, self.my_id = map(int, read_input().split())
 
-        logging.basicConfig(
-            filename="bot-{}.log".format(self.my_id),
-            filemode="w",
-            level=logging.DEBUG,
-        )
+        self._log_sampler = setup_logging(self.my_id, log_mode, log_level, log_every)
 
         self.players = {}
         for player in range(num_players):
             self.players[player] = Player._generate()
         self.me = self.players[self.my_id]
         self.game_map = GameMap._generate()
+        # Shipyards are read before the map, swap in the map's interned positions
+        for player in self.players.values():
+            player.shipyard.position = self.game_map.normalize(player.shipyard.position)
+        self.return_field = ReturnField(self.game_map)
+        self.ship_table = ShipTable(self.game_map.distances)
 
         constants.set_dimensions(self.game_map.width, self.game_map.height)
 
+        if self._recorder is not None:
+            self._recorder.open(record_path.format(id=self.my_id))
+            self._recorder.end_record()
+        if self.profiler is not None:
+            self._profile_path = self._profile_path.format(id=self.my_id)
+
     def ready(self, name):
         """
         Indicate that your bot is ready to play.
@@ -49,32 +85,104 @@ class Game:
         Updates the game object's state.
         :returns: nothing.
         """
-        self.turn_number = int(read_input())
-        logging.info("=============== TURN {:03} ================".format(self.turn_number))
-
+        # The whole turn is read and decoded at once, then each section is handed its slice. The engine's clock
+        # runs from when it sent the frame: the budget starts as its first line arrives, so reading and decoding
+        # the rest count against it
+        try:
+            frame_values = self._frame_reader.read_frame(len(self.players), self.budget.start)
+        except SystemExit:
+            # The engine closed its input, the game is over
+            if self.profiler is not None:
+                self.profiler.dump(self._profile_path)
+            raise
+        if self.profiler is not None:
+            self.profiler.start_turn()
+            started = time.perf_counter_ns()
+        if self._recorder is not None:
+            self._recorder.end_record()
+        frame = frame_values.tolist()
+
+        self.turn_number = frame[0]
+        self._cache.clear()
+        if self._log_sampler is not None:
+            self._log_sampler.turn = self.turn_number
+        logging.info("=============== TURN %03d ================", self.turn_number)
+
+        index = 1
+        ship_blocks = []
         for _ in range(len(self.players)):
-            player, num_ships, num_dropoffs, halite = map(int, read_input().split())
-            self.players[player]._update(num_ships, num_dropoffs, halite)
+            player, num_ships, num_dropoffs, halite = frame[index:index + 4]
+            ships_end = index + 4 + 4 * num_ships
+            dropoffs_end = ships_end + 3 * num_dropoffs
+            self.players[player]._update(num_ships, num_dropoffs, halite,
+                                         frame[index + 4:ships_end], frame[ships_end:dropoffs_end])
+            ship_blocks.append((player, frame_values[index + 4:ships_end]))
+            index = dropoffs_end
+        self.ship_table.update(ship_blocks)
 
-        self.game_map._update()
+        self.game_map._update(frame_values[index:])
 
         # Mark cells with ships as unsafe for navigation
         for player in self.players.values():
             for ship in player.get_ships():
-                self.game_map[ship.position].mark_unsafe(ship)
+                self.game_map._mark_ship(ship)
 
-            self.game_map[player.shipyard.position].structure = player.shipyard
+            self.game_map._mark_structure(player.shipyard)
             for dropoff in player.get_dropoffs():
-                self.game_map[dropoff.position].structure = dropoff
+                self.game_map._mark_structure(dropoff)
+
+        self.return_field.update(self.me)
+        if self.profiler is not None:
+            self.profiler.add("update_frame", time.perf_counter_ns() - started)
+
+    @turn_cached
+    def ships_by_owner(self):
+        """
+        :return: A read-only mapping of player id to the tuple of the player's ships
+        """
+        return MappingProxyType({player_id: player.get_ships() for player_id, player in self.players.items()})
+
+    @turn_cached
+    def enemy_ships(self):
+        """
+        :return: The tuple of the ships of the other players
+        """
+        return tuple(ship for player_id, player in self.players.items() if player_id != self.my_id
+                     for ship in player.get_ships())
+
+    @turn_cached
+    def ship_positions(self):
+        """
+        :return: The frozenset of the positions of every player's ships
+        """
+        return frozenset(ship.position for player in self.players.values() for ship in player.get_ships())
+
+    @turn_cached
+    def structure_positions(self):
+        """
+        :return: The frozenset of the positions of every player's shipyard and dropoffs
+        """
+        return frozenset(structure.position for player in self.players.values()
+                         for structure in (player.shipyard, *player.get_dropoffs()))
+
+    def cache_stats(self):
+        """
+        :return: A dict of the hits and misses of the per turn caches of the game and its players, since the start
+        """
+        caches = [self._cache] + [player._cache for player in self.players.values()]
+        return {"hits": sum(cache.hits for cache in caches), "misses": sum(cache.misses for cache in caches)}
 
     @staticmethod
     def end_turn(commands):
         """
         Method to send all commands to the game engine, effectively ending your turn.
-        :param commands: Array of commands to send to engine
+        :param commands: Array of commands, or a CommandBuilder, to send to engine
         :return: nothing.
         """
         send_commands(commands)
+        profiler = active_profiler()
+        if profiler is not None:
+            profiler.end_turn()
 
 
 def send_commands(commands):
@@ -83,5 +191,4 @@ def send_commands(commands):
     :param commands: The list of commands to send.
     :return: nothing.
     """
-    print(" ".join(commands))
-    sys.stdout.flush()
+    write_output(" ".join(commands))
@@ -0,0 +1,110 @@
+class OccupancyIndex:
+    """
+    Index of the ships and structures on the map for the current turn, keyed by cell.
+
+    Rebuilt by the map on every frame, it answers occupancy questions with a single dict lookup.
+    """
+    def __init__(self, positions, distances):
+        """
+        :param positions: The PositionPool of the map
+        :param distances: The DistanceTable of the map
+        """
+        self._positions = positions
+        self._distances = distances
+        self._ships = {}
+        self._structures = {}
+        self._diamonds = {}
+
+    def clear(self):
+        """
+        Forget every ship and structure, ahead of a new frame.
+        """
+        self._ships.clear()
+        self._structures.clear()
+
+    def add_ship(self, ship):
+        self._ships[ship.position] = ship
+
+    def add_structure(self, structure):
+        self._structures[structure.position] = structure
+
+    def is_occupied(self, position):
+        """
+        :return: Whether a ship is on the cell at position
+        """
+        return position in self._ships
+
+    def ship_at(self, position):
+        """
+        :return: The ship on the cell at position, or None
+        """
+        return self._ships.get(position)
+
+    def owner_at(self, position):
+        """
+        :return: The id of the player owning the ship at position, or None
+        """
+        ship = self._ships.get(position)
+        return None if ship is None else ship.owner
+
+    def ship_id_at(self, position):
+        """
+        :return: The id of the ship at position, or None
+        """
+        ship = self._ships.get(position)
+        return None if ship is None else ship.id
+
+    def structure_at(self, position):
+        """
+        :return: The shipyard or dropoff at position, or None
+        """
+        return self._structures.get(position)
+
+    def structure_owner_at(self, position):
+        """
+        :return: The id of the player owning the structure at position, or None
+        """
+        structure = self._structures.get(position)
+        return None if structure is None else structure.owner
+
+    def ships(self):
+        """
+        :return: All the indexed ships in a list
+        """
+        return list(self._ships.values())
+
+    def _diamond(self, radius):
+        """
+        :return: The (dx, dy) offsets of every cell within the given Manhattan radius
+        """
+        offsets = self._diamonds.get(radius)
+        if offsets is None:
+            offsets = [(dx, dy) for dy in range(-radius, radius + 1)
+                       for dx in range(abs(dy) - radius, radius - abs(dy) + 1)]
+            self._diamonds[radius] = offsets
+        return offsets
+
+    def ships_within(self, position, radius, owner=None):
+        """
+        Return the ships within a Manhattan distance of position.
+        Accounts for wrap-around.
+        :param position: The center position
+        :param radius: The maximum distance, inclusive
+        :param owner: Only return the ships of this player if given
+        :return: A list of ships
+        """
+        # Walk the cells of the diamond when it is smaller than the fleet, else the fleet
+        cell_count = 2 * radius * (radius + 1) + 1
+        fits = 2 * radius < min(self._positions.width, self._positions.height)
+        if fits and cell_count < len(self._ships):
+            get_position = self._positions.get
+            get_ship = self._ships.get
+            ships = [get_ship(get_position(position.x + dx, position.y + dy))
+                     for dx, dy in self._diamond(radius)]
+            ships = [ship for ship in ships if ship is not None]
+        else:
+            distance = self._distances.distance
+            ships = [ship for ship in self._ships.values() if distance(position, ship.position) <= radius]
+        if owner is not None:
+            ships = [ship for ship in ships if ship.owner == owner]
+        return ships
@@ -0,0 +1,202 @@
+import heapq
+
+import numpy as np
+
+import hlt.hlt_constants as constants
+from hlt.hlt_positionals import Direction
+
+"""Order of the neighbours of a cell, matching Direction.get_all_cardinals."""
+CARDINALS = Direction.get_all_cardinals()
+
+
+class PathTree:
+    """
+    Shortest-path tree of every cell of the map toward a root cell.
+
+    Costs only account for the halite burnt by moving (plus the per turn cost of the finder), not for ships,
+    so a tree stays valid across turns for as long as the halite landscape does not change much.
+    """
+    def __init__(self, game_map, root, costs, next_cells, directions, burn):
+        self.game_map = game_map
+        self.root = root
+        # Per flat cell index: cost of the cheapest route to the root, next cell toward the root
+        # and index in CARDINALS of the move onto it (-1 at the root)
+        self.costs = costs
+        self.next_cells = next_cells
+        self.directions = directions
+        self._burn = burn
+
+    def cost_to_root(self, position):
+        """
+        :return: The cost of the cheapest route from position to the root
+        """
+        return self.costs[self.game_map.cell_index(position)]
+
+    def direction_to_root(self, position):
+        """
+        :return: The first move of the cheapest route from position to the root, Still at the root
+        """
+        direction = self.directions[self.game_map.cell_index(position)]
+        return Direction.Still if direction < 0 else CARDINALS[direction]
+
+    def path_to_root(self, position):
+        """
+        :return: The positions of the cheapest route from position (excluded) to the root (included)
+        """
+        index_position = self.game_map.index_position
+        path = []
+        index = self.next_cells[self.game_map.cell_index(position)]
+        while index >= 0:
+            path.append(index_position(index))
+            index = self.next_cells[index]
+        return path
+
+
+class PathFinder:
+    """
+    A* and Dijkstra searches over the wrap-around map.
+
+    Leaving a cell costs the halite burnt on it (1/MOVE_COST_RATIO of its halite) plus turn_cost, and
+    entering a cell holding a ship costs occupied_cost on top. Shortest-path trees toward a root are
+    cached and reused until the total change in burn cost over the map exceeds rebuild_threshold.
+    """
+    def __init__(self, game_map, turn_cost=1, occupied_cost=1000, rebuild_threshold=100):
+        """
+        :param game_map: The map to search
+        :param turn_cost: Cost of each move, in halite, on top of the halite burnt
+        :param occupied_cost: Extra cost of moving onto a cell holding a ship
+        :param rebuild_threshold: Total burn change, in halite, after which a cached tree is rebuilt
+        """
+        self.game_map = game_map
+        self.turn_cost = turn_cost
+        self.occupied_cost = occupied_cost
+        self.rebuild_threshold = rebuild_threshold
+        # Lists index faster than arrays in the pure Python searches
+        self._neighbours = game_map.neighbours.tolist()
+        self._trees = {}
+        # Per cell costs of the current turn, see _turn_costs
+        self._costs_version = None
+        self._burn = None
+        self._leave_costs = None
+        self._enter_costs = None
+
+    def _turn_costs(self):
+        """
+        Computes the per cell costs once per map update, as ships only move between turns.
+        :return: The burn array, then the lists of the cost of leaving each cell and of entering it while occupied
+        """
+        if self._costs_version != self.game_map.version:
+            self._burn = (self.game_map.halite_array // constants.MOVE_COST_RATIO).ravel()
+            self._leave_costs = (self._burn + self.turn_cost).tolist()
+            self._enter_costs = np.where(self.game_map.ship_owners.ravel() >= 0, self.occupied_cost, 0).tolist()
+            self._costs_version = self.game_map.version
+        return self._burn, self._leave_costs, self._enter_costs
+
+    def find_path(self, source, target, avoid_occupied=True):
+        """
+        Find the cheapest route with A*, stopping as soon as the target is reached.
+        :param source: The starting position
+        :param target: The destination position
+        :param avoid_occupied: Whether cells holding a ship cost occupied_cost more to enter (the target never does)
+        :return: The positions of the route from source (excluded) to target (included), or None if unreachable
+        """
+        width = self.game_map.width
+        start = self.game_map.cell_index(source)
+        goal = self.game_map.cell_index(target)
+        _, leave_costs, enter_costs = self._turn_costs()
+        if not avoid_occupied:
+            enter_costs = None
+        # Every move costs at least turn_cost, so it scales an admissible heuristic, computed per cell reached
+        x_distances, y_distances = self.game_map.distances.axis_distances(target)
+        turn_cost = self.turn_cost
+        neighbours = self._neighbours
+
+        costs = {start: 0}
+        previous = {start: -1}
+        frontier = [((x_distances[start % width] + y_distances[start // width]) * turn_cost, 0, start)]
+        while frontier:
+            _, cost, index = heapq.heappop(frontier)
+            if index == goal:
+                break
+            if cost > costs[index]:
+                continue
+            step = leave_costs[index]
+            for neighbour in neighbours[index]:
+                new_cost = cost + step
+                if enter_costs is not None and neighbour != goal:
+                    new_cost += enter_costs[neighbour]
+                if new_cost < costs.get(neighbour, new_cost + 1):
+                    costs[neighbour] = new_cost
+                    previous[neighbour] = index
+                    estimate = (x_distances[neighbour % width] + y_distances[neighbour // width]) * turn_cost
+                    heapq.heappush(frontier, (new_cost + estimate, new_cost, neighbour))
+        else:
+            return None
+
+        index_position = self.game_map.index_position
+        path = []
+        index = goal
+        while index != start:
+            path.append(index_position(index))
+            index = previous[index]
+        path.reverse()
+        return path
+
+    def next_direction(self, source, target, avoid_occupied=True):
+        """
+        :return: The first move of the cheapest route from source to target, Still if there is none
+        """
+        path = self.find_path(source, target, avoid_occupied)
+        if not path:
+            return Direction.Still
+        cell_index = self.game_map.cell_index
+        return CARDINALS[self._neighbours[cell_index(source)].index(cell_index(path[0]))]
+
+    def _build_tree(self, root, burn):
+        """
+        Runs Dijkstra outward from root over reversed moves.
+        """
+        cell_count = self.game_map.width * self.game_map.height
+        leave_costs = (burn + self.turn_cost).tolist()
+        neighbours = self._neighbours
+        infinity = float('inf')
+        costs = [infinity] * cell_count
+        next_cells = [-1] * cell_count
+        directions = [-1] * cell_count
+        costs[root] = 0
+        frontier = [(0, root)]
+        while frontier:
+            cost, index = heapq.heappop(frontier)
+            if cost > costs[index]:
+                continue
+            for neighbour in neighbours[index]:
+                # Moving from neighbour onto index burns the halite of neighbour
+                new_cost = cost + leave_costs[neighbour]
+                if new_cost < costs[neighbour]:
+                    costs[neighbour] = new_cost
+                    next_cells[neighbour] = index
+                    directions[neighbour] = neighbours[neighbour].index(index)
+                    heapq.heappush(frontier, (new_cost, neighbour))
+        return PathTree(self.game_map, root, costs, next_cells, directions, burn)
+
+    def tree(self, root):
+        """
+        Return the shortest-path tree toward root, rebuilding the cached one if the halite changed enough.
+        :param root: The position routes lead to, typically a shipyard or dropoff
+        :return: A PathTree
+        """
+        index = self.game_map.cell_index(root)
+        burn = self._turn_costs()[0]
+        tree = self._trees.get(index)
+        if tree is None or int(np.abs(burn - tree._burn).sum()) > self.rebuild_threshold:
+            tree = self._build_tree(index, burn)
+            self._trees[index] = tree
+        return tree
+
+    def structure_trees(self, player):
+        """
+        :param player: The player whose structures to route to
+        :return: A dict of the shortest-path trees toward the player's shipyard and dropoffs, keyed by structure id
+        """
+        structures = [player.shipyard, *player.get_dropoffs()]
+        return {structure.id: self.tree(structure.position) for structure in structures}
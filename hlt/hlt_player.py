@@ -1,10 +1,15 @@
 from hlt.hlt_entity import Shipyard, Ship, Dropoff
 from hlt.hlt_positionals import Position
 from hlt.hlt_common import read_input
+from hlt.hlt_turn_cache import TurnCache, turn_cached
 
 class Player:
     """
     Player object containing all items/metadata pertinent to the player.
+
+    The player's ships and dropoffs are its own: the same objects are updated from turn to turn, so a game's
+    entities live as long as they are in the engine's frames and as long as the game itself.
+    Lists of them are built once per turn and shared, as tuples.
     """
     def __init__(self, player_id, shipyard, halite=0):
         self.id = player_id
@@ -12,6 +17,7 @@ class Player:
         self.halite_amount = halite
         self._ships = {}
         self._dropoffs = {}
+        self._cache = TurnCache()
 
     def get_ship(self, ship_id):
         """
@@ -21,11 +27,12 @@ class Player:
         """
         return self._ships[ship_id]
 
+    @turn_cached
     def get_ships(self):
         """
-        :return: Returns all ship objects in a list
+        :return: Returns all ship objects in a tuple
         """
-        return list(self._ships.values())
+        return tuple(self._ships.values())
 
     def get_dropoff(self, dropoff_id):
         """
@@ -35,11 +42,12 @@ class Player:
         """
         return self._dropoffs[dropoff_id]
 
+    @turn_cached
     def get_dropoffs(self):
         """
-        :return: Returns all dropoff objects in a list
+        :return: Returns all dropoff objects in a tuple
         """
-        return list(self._dropoffs.values())
+        return tuple(self._dropoffs.values())
 
     def has_ship(self, ship_id):
         """
@@ -63,14 +71,37 @@ class Player:
         player, shipyard_x, shipyard_y = map(int, read_input().split())
         return Player(player, Shipyard(player, -1, Position(shipyard_x, shipyard_y, normalize=False)))
 
-    def _update(self, num_ships, num_dropoffs, halite):
+    def _update(self, num_ships, num_dropoffs, halite, ship_values=None, dropoff_values=None):
         """
         Updates this player object considering the input from the game engine for the current specific turn.
         :param num_ships: The number of ships this player has this turn
         :param num_dropoffs: The number of dropoffs this player has this turn
         :param halite: How much halite the player has in total
+        :param ship_values: The flat (id, x, y, halite) values of the ships if already read, else they are read from input
+        :param dropoff_values: The flat (id, x, y) values of the dropoffs if already read, else they are read from input
         :return: nothing.
         """
         self.halite_amount = halite
-        self._ships = {id: ship for (id, ship) in [Ship._generate(self.id) for _ in range(num_ships)]}
-        self._dropoffs = {id: dropoff for (id, dropoff) in [Dropoff._generate(self.id) for _ in range(num_dropoffs)]}
+        self._cache.clear()
+        # Ships and dropoffs are kept from turn to turn, updated in place, and dropped once gone from the frame
+        ships = self._ships
+        if ship_values is None:
+            alive = {Ship._generate(self.id, ships)[0] for _ in range(num_ships)}
+        else:
+            alive = {Ship._from_values(self.id, *values, ships)[0] for values in
+                     zip(ship_values[0::4], ship_values[1::4], ship_values[2::4], ship_values[3::4])}
+        if len(ships) > len(alive):
+            for ship_id in [ship_id for ship_id in ships if ship_id not in alive]:
+                del ships[ship_id]
+
+        dropoffs = self._dropoffs
+        if dropoff_values is None:
+            dropoff_values = [value for _ in range(num_dropoffs) for value in map(int, read_input().split())]
+        for dropoff_id, x_position, y_position in zip(dropoff_values[0::3], dropoff_values[1::3],
+                                                      dropoff_values[2::3]):
+            if dropoff_id not in dropoffs:
+                dropoffs[dropoff_id] = Dropoff._from_values(self.id, dropoff_id, x_position, y_position)[1]
+        if len(dropoffs) > num_dropoffs:
+            alive = set(dropoff_values[0::3])
+            for dropoff_id in [dropoff_id for dropoff_id in dropoffs if dropoff_id not in alive]:
+                del dropoffs[dropoff_id]
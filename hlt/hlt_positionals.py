@@ -1,3 +1,5 @@
+import threading
+
 import hlt.hlt_commands as commands
 import hlt.hlt_constants as constants
 
@@ -62,16 +64,39 @@ class Direction:
 
 
 class Position:
-    def __init__(self, x, y, normalize=True):
-        self.x = x
-        self.y = y
+    """
+    An immutable cell coordinate.
+
+    While a PositionPool is active on the current thread, normalized positions are interned: constructing, offsetting or adding
+    positions returns the single canonical instance of the cell, so equality is usually an identity check.
+    """
+    __slots__ = ('x', 'y', '_hash')
 
+    def __new__(cls, x, y, normalize=True):
+        pool = getattr(_local, 'pool', None)
+        if pool is not None and (normalize or (0 <= x < pool.width and 0 <= y < pool.height)):
+            return pool.get(x, y)
         if normalize:
-            self.normalize()
+            x = x % constants.WIDTH
+            y = y % constants.HEIGHT
+        return cls._make(x, y)
+
+    @classmethod
+    def _make(cls, x, y):
+        """
+        Allocates a new position without normalizing it or looking it up in the pool.
+        """
+        position = object.__new__(cls)
+        object.__setattr__(position, 'x', x)
+        object.__setattr__(position, 'y', y)
+        object.__setattr__(position, '_hash', hash((x, y)))
+        return position
 
     def normalize(self):
-        self.x = self.x % constants.WIDTH
-        self.y = self.y % constants.HEIGHT
+        """
+        :return: The position wrapped within the bounds of the map
+        """
+        return Position(self.x, self.y)
 
     def directional_offset(self, direction):
         """
@@ -79,37 +104,37 @@ class Position:
         :param direction: the direction cardinal tuple
         :return: a new position moved in that direction
         """
-        return self + Position(*direction)
+        return Position(self.x + direction[0], self.y + direction[1])
 
     def get_surrounding_cardinals(self):
         """
         :return: Returns a list of all positions around this specific position in each cardinal direction
         """
+        pool = getattr(_local, 'pool', None)
+        if pool is not None and self is pool.get(self.x, self.y):
+            return list(pool.get_surrounding_cardinals(self))
         return [self.directional_offset(current_direction) for current_direction in Direction.get_all_cardinals()]
 
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    def __reduce__(self):
+        return Position, (self.x, self.y, False)
+
     def __add__(self, other):
         return Position(self.x + other.x, self.y + other.y)
 
     def __sub__(self, other):
         return Position(self.x - other.x, self.y - other.y)
 
-    def __iadd__(self, other):
-        self.x += other.x
-        self.y += other.y
-        self.normalize()
-        return self
-
-    def __isub__(self, other):
-        self.x -= other.x
-        self.y -= other.y
-        self.normalize()
-        return self
-
     def __abs__(self):
         return Position(abs(self.x), abs(self.y))
 
     def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
+        return self is other or (self.x == other.x and self.y == other.y)
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -120,4 +145,53 @@ class Position:
                                    self.y)
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self._hash
+
+
+class PositionPool:
+    """
+    Holds the canonical Position instance of every cell of a map, along with its cardinal neighbours.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._positions = [[Position._make(x, y) for x in range(width)] for y in range(height)]
+        self._cardinals = [None] * (width * height)
+
+    def get(self, x, y):
+        """
+        :param x: The x coordinate, wrapped around the map
+        :param y: The y coordinate, wrapped around the map
+        :return: The canonical position of that cell
+        """
+        return self._positions[y % self.height][x % self.width]
+
+    def get_surrounding_cardinals(self, position):
+        """
+        :param position: A position of this pool
+        :return: A tuple of the canonical positions north, south, east and west of position
+        """
+        index = position.y * self.width + position.x
+        cardinals = self._cardinals[index]
+        if cardinals is None:
+            cardinals = tuple(self.get(position.x + dx, position.y + dy)
+                              for dx, dy in Direction.get_all_cardinals())
+            self._cardinals[index] = cardinals
+        return cardinals
+
+    def activate(self):
+        """
+        Make Position construction and arithmetic on the current thread return the instances of this pool.
+        """
+        _local.pool = self
+
+
+def active_pool():
+    """
+    :return: The PositionPool active on the current thread, None if there is none
+    """
+    return getattr(_local, 'pool', None)
+
+
+# Per thread active pool, so bots running in-process each intern positions on their own map
+_local = threading.local()
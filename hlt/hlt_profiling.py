@@ -0,0 +1,216 @@
+"""
+Per-turn timing spans and counters, aggregated into per-turn histograms over a game.
+
+Code is instrumented with span(name) as a context manager, timed(name) as a decorator and count(name). They
+record into the TurnProfiler activated on the current thread, so bots running in-process keep separate
+profiles, and cost one global lookup when no profiler is active. Game activates a profiler when given
+profile_path or the HALITE_PROFILE environment variable, closes each turn in end_turn and dumps the
+summary when the engine closes its input.
+"""
+import functools
+import json
+import threading
+import time
+
+"""Environment variable naming the file to dump the profile into, "{id}" being replaced by the player id."""
+PROFILE_ENVIRONMENT_VARIABLE = "HALITE_PROFILE"
+
+_local = threading.local()
+# Whether any thread profiles, so that spans cost a single global lookup when none does
+_enabled = False
+
+
+class TurnProfiler:
+    """
+    Collects the time spent in each named span and each counter's total, turn by turn.
+    """
+    def __init__(self):
+        # Name to [nanoseconds, calls] for the turn in progress, and to per-turn values for past turns
+        self._spans = {}
+        self._counters = {}
+        self._span_turns = {}
+        self._call_turns = {}
+        self._counter_turns = {}
+        self._turn_started = None
+        self.turns = 0
+
+    def activate(self):
+        """
+        Make this profiler the one the spans and counters of the current thread record into.
+        """
+        global _enabled
+        _local.profiler = self
+        _enabled = True
+
+    @staticmethod
+    def deactivate():
+        _local.profiler = None
+
+    def add(self, name, nanoseconds, calls=1):
+        """
+        Record time spent in a span during the turn in progress.
+        """
+        entry = self._spans.get(name)
+        if entry is None:
+            self._spans[name] = [nanoseconds, calls]
+        else:
+            entry[0] += nanoseconds
+            entry[1] += calls
+
+    def count(self, name, amount=1):
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    def start_turn(self):
+        """
+        Start the clock of the "turn" span, closed by end_turn.
+        """
+        self._turn_started = time.perf_counter_ns()
+
+    def end_turn(self):
+        """
+        Close the turn in progress, appending each span's and counter's total to its history.
+        """
+        if self._turn_started is not None:
+            self.add("turn", time.perf_counter_ns() - self._turn_started)
+            self._turn_started = None
+        for name, (nanoseconds, calls) in self._spans.items():
+            self._span_turns.setdefault(name, []).append(nanoseconds)
+            self._call_turns.setdefault(name, []).append(calls)
+        for name, amount in self._counters.items():
+            self._counter_turns.setdefault(name, []).append(amount)
+        self._spans = {}
+        self._counters = {}
+        self.turns += 1
+
+    @staticmethod
+    def _histogram(values):
+        ordered = sorted(values)
+        return {"turns": len(ordered),
+                "p50": ordered[(len(ordered) - 1) // 2],
+                "p95": ordered[int(0.95 * (len(ordered) - 1))],
+                "max": ordered[-1],
+                "total": sum(ordered)}
+
+    def summary(self):
+        """
+        :return: A dict with, for every span, the number of turns it ran in, its p50, p95, max and total time
+            per turn in milliseconds and its mean calls per turn, and the same histograms for every counter
+        """
+        spans = {}
+        for name, values in self._span_turns.items():
+            histogram = self._histogram(values)
+            for key in ("p50", "p95", "max", "total"):
+                histogram[key] /= 1e6
+            histogram["calls"] = sum(self._call_turns[name]) / len(values)
+            spans[name] = histogram
+        counters = {name: self._histogram(values) for name, values in self._counter_turns.items()}
+        return {"turns": self.turns, "spans": spans, "counters": counters}
+
+    def format_summary(self):
+        """
+        :return: The summary as a text table, spans by decreasing total time
+        """
+        summary = self.summary()
+        lines = ["{:<24} {:>6} {:>9} {:>9} {:>9} {:>10} {:>7}".format(
+            "span (ms per turn)", "turns", "p50", "p95", "max", "total", "calls")]
+        for name, row in sorted(summary["spans"].items(), key=lambda item: -item[1]["total"]):
+            lines.append("{:<24} {:>6} {:>9.3f} {:>9.3f} {:>9.3f} {:>10.1f} {:>7.1f}".format(
+                name, row["turns"], row["p50"], row["p95"], row["max"], row["total"], row["calls"]))
+        for name, row in sorted(summary["counters"].items()):
+            lines.append("{:<24} {:>6} {:>9} {:>9} {:>9} {:>10}".format(
+                name, row["turns"], row["p50"], row["p95"], row["max"], row["total"]))
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """
+        Write the summary as JSON.
+        :param path: The path of the file to write
+        """
+        with open(path, "w") as profile_file:
+            json.dump(self.summary(), profile_file, indent=1, sort_keys=True)
+
+
+def active_profiler():
+    """
+    :return: The TurnProfiler of the current thread, None if it does not profile
+    """
+    if not _enabled:
+        return None
+    return getattr(_local, 'profiler', None)
+
+
+class _Span:
+    __slots__ = ('_profiler', '_name', '_started')
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiler.add(self._name, time.perf_counter_ns() - self._started)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """
+    Time a block of code under a name: "with span('targets'):".
+    :return: A context manager, doing nothing if the current thread does not profile
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None:
+        return _NULL_SPAN
+    return _Span(profiler, name)
+
+
+def timed(name=None):
+    """
+    Decorator timing every call of a function as a span.
+    :param name: The name of the span, defaults to the function's qualified name
+    """
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            profiler = getattr(_local, 'profiler', None)
+            if profiler is None:
+                return function(*args, **kwargs)
+            started = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.add(span_name, time.perf_counter_ns() - started)
+        return wrapper
+    return decorator
+
+
+def count(name, amount=1):
+    """
+    Add to a counter of the turn in progress, if the current thread profiles.
+    """
+    if not _enabled:
+        return
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is not None:
+        profiler.count(name, amount)
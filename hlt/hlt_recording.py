@@ -0,0 +1,205 @@
+"""
+Recording of the raw engine input of a game, and replay of it into a bot script without an engine.
+
+A recording starts with MAGIC, then holds length-prefixed records: a little-endian uint32 size followed
+by that many bytes of engine input. The first record is the pre-game input (constants, players and map),
+each following one the input of a turn. Record a game by passing record_path to Game, or by setting the
+HALITE_RECORD environment variable, then replay it as:
+
+    python -m hlt.hlt_recording bot-0.hlr MyBot.py --turn 150
+"""
+import argparse
+import io
+import os
+import struct
+import sys
+import time
+
+from hlt.hlt_common import current_streams, use_streams, run_script
+
+MAGIC = b"HLTREC1\n"
+
+"""Environment variable naming the file to record into, "{id}" being replaced by the player id."""
+RECORD_ENVIRONMENT_VARIABLE = "HALITE_RECORD"
+
+_LENGTH = struct.Struct("<I")
+
+
+class InputRecorder:
+    """
+    A binary input stream wrapper copying every line read through it into the records of a recording.
+    """
+    def __init__(self, stream):
+        """
+        :param stream: The binary stream to read from
+        """
+        self._stream = stream
+        self._pending = []
+        self._file = None
+
+    @staticmethod
+    def install():
+        """
+        Wrap the engine input of the current thread, before anything is read from it.
+        :return: The InputRecorder now reading the engine input
+        """
+        stream, output = current_streams()
+        if stream is None:
+            stream = getattr(sys.stdin, 'buffer', None)
+            if stream is None:
+                raise ValueError("Recording needs a binary input stream")
+        recorder = InputRecorder(stream)
+        use_streams(recorder, output)
+        return recorder
+
+    def readline(self):
+        line = self._stream.readline()
+        self._pending.append(line)
+        return line
+
+    def open(self, path):
+        """
+        Start writing the recording, including what has been read so far.
+        :param path: The path of the recording file
+        """
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+
+    def end_record(self):
+        """
+        Write what has been read since the previous record as one record.
+        """
+        data = b"".join(self._pending)
+        self._pending = []
+        self._file.write(_LENGTH.pack(len(data)))
+        self._file.write(data)
+        # Flushed at every turn so a recording survives a killed bot
+        self._file.flush()
+
+
+def _split_frame(frame, num_players):
+    """
+    :return: The lines of a turn's input before its changed cells, and the changed cell lines
+    """
+    lines = frame.splitlines()
+    index = 1
+    for _ in range(num_players):
+        _, num_ships, num_dropoffs, _ = lines[index].split()
+        index += 1 + int(num_ships) + int(num_dropoffs)
+    num_cells = int(lines[index])
+    return lines[:index], lines[index + 1:index + 1 + num_cells]
+
+
+class Recording:
+    """
+    The records of a recorded game.
+    """
+    def __init__(self, pre_game, frames):
+        """
+        :param pre_game: The pre-game input
+        :param frames: The input of each turn, in order
+        """
+        self.pre_game = pre_game
+        self.frames = frames
+        self.num_players = int(pre_game.splitlines()[1].split()[0])
+        self.turns = [int(frame.split(b"\n", 1)[0]) for frame in frames]
+
+    @staticmethod
+    def load(path):
+        """
+        :param path: The path of a recording file
+        :return: The Recording it holds
+        """
+        with open(path, "rb") as recording_file:
+            data = recording_file.read()
+        if not data.startswith(MAGIC):
+            raise ValueError("{} is not a recording".format(path))
+        records = []
+        offset = len(MAGIC)
+        while offset < len(data):
+            length, = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            records.append(data[offset:offset + length])
+            offset += length
+        return Recording(records[0], records[1:])
+
+    def stream(self, start_turn=None, end_turn=None):
+        """
+        Build the engine input of the recorded game from start_turn to end_turn, both included.
+
+        Ships, dropoffs and player halite are sent whole every turn, only the map is sent as changes: when
+        starting after the first turn, the first frame carries every cell changed since the start of the game.
+        :param start_turn: The first turn to send, None for the first recorded one
+        :param end_turn: The last turn to send, None for the last recorded one
+        :return: A binary stream of the pre-game input followed by the selected turns
+        """
+        selected = [index for index, turn in enumerate(self.turns)
+                    if (start_turn is None or turn >= start_turn) and (end_turn is None or turn <= end_turn)]
+        if not selected:
+            return io.BytesIO(self.pre_game)
+        first = selected[0]
+        frames = [self.frames[index] for index in selected]
+        if first > 0:
+            cells = {}
+            for frame in self.frames[:first + 1]:
+                for line in _split_frame(frame, self.num_players)[1]:
+                    x, y, _ = line.split()
+                    cells[(x, y)] = line
+            head, _ = _split_frame(self.frames[first], self.num_players)
+            frames[0] = b"\n".join(head + [str(len(cells)).encode()] + list(cells.values())) + b"\n"
+        return io.BytesIO(self.pre_game + b"".join(frames))
+
+
+def replay(recording, script, start_turn=None, end_turn=None, init_globals=None):
+    """
+    Run a bot script on a recording on the current thread, as fast as it goes, without an engine.
+    :param recording: A Recording
+    :param script: The path of the bot script, such as MyBot.py
+    :param start_turn: The first turn to play, None for the first recorded one
+    :param end_turn: The last turn to play, None for the last recorded one
+    :param init_globals: A dict of globals the script starts with
+    :return: A list of (turn, commands, seconds) for every turn played; seconds run from the previous answer
+    """
+    turns = [turn for turn in recording.turns
+             if (start_turn is None or turn >= start_turn) and (end_turn is None or turn <= end_turn)]
+    answers = []
+    last_answer = [time.perf_counter()]
+
+    def output(line):
+        now = time.perf_counter()
+        answers.append((line, now - last_answer[0]))
+        last_answer[0] = now
+
+    script_directory = os.path.dirname(os.path.abspath(script))
+    if script_directory not in sys.path:
+        sys.path.insert(0, script_directory)
+    previous_streams = current_streams()
+    use_streams(recording.stream(start_turn, end_turn), output)
+    try:
+        run_script(script, init_globals)
+    finally:
+        use_streams(*previous_streams)
+    # The first answer is the bot's name
+    return [(turn, line, seconds) for turn, (line, seconds) in zip(turns, answers[1:])]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded game into a bot script.")
+    parser.add_argument("recording", help="The recording file")
+    parser.add_argument("script", help="The bot script, such as MyBot.py")
+    parser.add_argument("--turn", type=int, default=None, help="The first turn to play")
+    parser.add_argument("--until", type=int, default=None, help="The last turn to play")
+    parser.add_argument("--slowest", type=int, default=10, help="The number of slowest turns to list")
+    args = parser.parse_args(argv)
+
+    turns = replay(Recording.load(args.recording), args.script, args.turn, args.until)
+    if not turns:
+        return
+    total = sum(seconds for _, _, seconds in turns)
+    print("{} turns in {:.3f}s, {:.2f}ms per turn".format(len(turns), total, 1000 * total / len(turns)))
+    for turn, _, seconds in sorted(turns, key=lambda played: -played[2])[:args.slowest]:
+        print("turn {:>3} {:>9.2f}ms".format(turn, 1000 * seconds))
+
+
+if __name__ == "__main__":
+    main()
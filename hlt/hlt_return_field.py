@@ -0,0 +1,84 @@
+import numpy as np
+
+from hlt.hlt_positionals import Direction
+from hlt.hlt_profiling import timed
+
+"""Order of the moves stored in ReturnField.directions, matching Direction.get_all_cardinals."""
+CARDINALS = Direction.get_all_cardinals()
+
+
+class ReturnField:
+    """
+    Distance from every cell to the closest structure of a player, and the first move toward it.
+
+    The field covers the shipyard and every dropoff and is only rebuilt when one of them appears or
+    disappears, so returning ships get their distance and next move with a single lookup.
+    Arrays are indexed [y, x].
+    """
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.structures = []
+        self.distances = None
+        self.nearest = None
+        self.directions = None
+        self._key = None
+
+    @timed("return_field")
+    def update(self, player):
+        """
+        Rebuild the field if the player's structures changed since the last update.
+        :param player: The player whose structures ships return to
+        :return: Whether the field was rebuilt
+        """
+        structures = [player.shipyard, *player.get_dropoffs()]
+        key = tuple((structure.id, structure.position) for structure in structures)
+        if key == self._key:
+            return False
+        self._key = key
+        self._rebuild(structures)
+        return True
+
+    def _rebuild(self, structures):
+        distance_grid = self.game_map.distances.distance_grid
+        grids = np.stack([distance_grid(structure.position) for structure in structures])
+        self.structures = structures
+        self.nearest = grids.argmin(axis=0)
+        self.distances = grids.min(axis=0).astype(np.int32)
+
+        # A move is toward home if the neighbour it leads to is one step closer; the first cardinal wins ties
+        directions = np.full(self.distances.shape, -1, dtype=np.int8)
+        closer = self.distances - 1
+        for index in reversed(range(len(CARDINALS))):
+            dx, dy = CARDINALS[index]
+            neighbour = np.roll(self.distances, shift=(-dy, -dx), axis=(0, 1))
+            directions[neighbour == closer] = index
+        self.directions = directions
+
+    def distance(self, position):
+        """
+        :return: The distance from position to the closest structure
+        """
+        return int(self.distances[position.y % self.game_map.height, position.x % self.game_map.width])
+
+    def direction(self, position):
+        """
+        :return: The first move from position toward the closest structure, Still on a structure
+        """
+        index = self.directions[position.y % self.game_map.height, position.x % self.game_map.width]
+        return Direction.Still if index < 0 else CARDINALS[index]
+
+    def moves(self, position):
+        """
+        :return: Every move from position one step closer to the closest structure, in CARDINALS order; none on a
+            structure
+        """
+        height, width = self.distances.shape
+        closer = self.distances[position.y % height, position.x % width] - 1
+        return [direction for direction in CARDINALS
+                if self.distances[(position.y + direction[1]) % height, (position.x + direction[0]) % width] == closer]
+
+    def nearest_structure(self, position):
+        """
+        :return: The shipyard or dropoff closest to position
+        """
+        return self.structures[self.nearest[position.y % self.game_map.height, position.x % self.game_map.width]]
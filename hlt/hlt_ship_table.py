@@ -0,0 +1,106 @@
+import numpy as np
+
+
+class ShipTable:
+    """
+    Every ship of the current frame as columns: ids, owners, xs, ys and cargo arrays, one row per ship.
+
+    Game rebuilds it from the decoded frame each turn, so fleet-wide questions (enemy ships near some points,
+    loaded ships, nearest enemy of every cell) are array operations rather than loops over Ship objects.
+    Queries selecting ships take owner (ships of that player) and enemy_of (ships of any other player).
+    """
+    def __init__(self, distances):
+        """
+        :param distances: The DistanceTable of the map
+        """
+        self._distances = distances
+        self.ids = np.empty(0, dtype=np.int64)
+        self.owners = np.empty(0, dtype=np.int64)
+        self.xs = np.empty(0, dtype=np.int64)
+        self.ys = np.empty(0, dtype=np.int64)
+        self.cargo = np.empty(0, dtype=np.int64)
+        self._rows = None
+
+    def update(self, blocks):
+        """
+        Replace the table with the ships of a new frame.
+        :param blocks: A list of (player id, flat int array of the player's ships as id x y halite)
+        """
+        values = [ship_values for _, ship_values in blocks]
+        table = np.concatenate(values).reshape(-1, 4) if values else np.empty((0, 4), dtype=np.int64)
+        self.owners = np.repeat([player_id for player_id, _ in blocks],
+                                [len(ship_values) // 4 for ship_values in values]).astype(np.int64)
+        self.ids = table[:, 0]
+        self.xs = table[:, 1]
+        self.ys = table[:, 2]
+        self.cargo = table[:, 3]
+        self._rows = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row(self, ship_id):
+        """
+        :return: The row of a ship, None if it is not in the table
+        """
+        if self._rows is None:
+            self._rows = dict(zip(self.ids.tolist(), range(len(self.ids))))
+        return self._rows.get(ship_id)
+
+    def rows(self, owner=None, enemy_of=None, min_cargo=None):
+        """
+        :param owner: Keep the ships of this player
+        :param enemy_of: Keep the ships of the other players
+        :param min_cargo: Keep the ships carrying at least this much halite
+        :return: The array of the rows selected
+        """
+        mask = np.ones(len(self.ids), dtype=bool)
+        if owner is not None:
+            mask &= self.owners == owner
+        if enemy_of is not None:
+            mask &= self.owners != enemy_of
+        if min_cargo is not None:
+            mask &= self.cargo >= min_cargo
+        return np.flatnonzero(mask)
+
+    def distances(self, points, rows=None):
+        """
+        :param points: An iterable of positions, or a tuple of (xs, ys) arrays
+        :param rows: The rows of the ships, None for all of them
+        :return: A (len(points), len(rows)) array of the distances from each point to each ship
+        """
+        if rows is None:
+            rows = np.arange(len(self.ids))
+        return self._distances.many_to_many(points, (self.xs[rows], self.ys[rows]))
+
+    def count_within(self, points, radius, owner=None, enemy_of=None):
+        """
+        :return: For each point, the number of selected ships within radius of it
+        """
+        rows = self.rows(owner, enemy_of)
+        return (self.distances(points, rows) <= radius).sum(axis=1)
+
+    def within(self, points, radius, owner=None, enemy_of=None):
+        """
+        :return: For each point, the array of the ids of the selected ships within radius of it
+        """
+        rows = self.rows(owner, enemy_of)
+        close = self.distances(points, rows) <= radius
+        ids = self.ids[rows]
+        return [ids[point_close] for point_close in close]
+
+    def nearest(self, owner=None, enemy_of=None):
+        """
+        The nearest selected ship of every cell.
+        :return: A tuple of (height, width) arrays: the distance to that ship (-1 if none is selected) and its id
+        """
+        width, height = self._distances.width, self._distances.height
+        rows = self.rows(owner, enemy_of)
+        if len(rows) == 0:
+            return np.full((height, width), -1, dtype=np.int64), np.full((height, width), -1, dtype=np.int64)
+        cell_xs = np.tile(np.arange(width), height)
+        cell_ys = np.repeat(np.arange(height), width)
+        distances = self.distances((cell_xs, cell_ys), rows)
+        closest = distances.argmin(axis=1)
+        nearest_distances = distances[np.arange(len(closest)), closest]
+        return nearest_distances.reshape(height, width), self.ids[rows][closest].reshape(height, width)
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class SummedAreaTable:
+    """
+    Wrap-aware 2D prefix sums of a [y, x] array, for O(1) square window sums.
+
+    The prefix sums cover the array tiled twice along each axis, so any window wrapping around the
+    edges of the map is a plain rectangle of the table. The table is rebuilt lazily on the first
+    query after invalidate() is called.
+    """
+    def __init__(self, values):
+        """
+        :param values: The array to sum, indexed [y, x]; it is read again after every invalidate()
+        """
+        self.values = values
+        self.height, self.width = values.shape
+        self._table = None
+
+    def invalidate(self):
+        """
+        Mark the table stale after the values changed.
+        """
+        self._table = None
+
+    @property
+    def table(self):
+        """
+        :return: The (2 * height + 1, 2 * width + 1) int64 prefix sums of the tiled values
+        """
+        if self._table is None:
+            table = np.zeros((2 * self.height + 1, 2 * self.width + 1), dtype=np.int64)
+            np.cumsum(np.tile(self.values, (2, 2)), axis=0, dtype=np.int64, out=table[1:, 1:])
+            np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+            self._table = table
+        return self._table
+
+    def _extents(self, radius):
+        """
+        :return: The window height and width for a radius, clamped to the map size
+        """
+        side = 2 * radius + 1
+        return min(side, self.height), min(side, self.width)
+
+    def window_sum(self, center, radius):
+        """
+        Sum the values of the square window of the given radius around center.
+        Accounts for wrap-around. Windows larger than the map are clamped to the map.
+        :param center: The position at the center of the window
+        :param radius: The half size of the window
+        :return: The sum of the window
+        """
+        table = self.table
+        rows, cols = self._extents(radius)
+        top = (center.y - radius) % self.height
+        left = (center.x - radius) % self.width
+        return int(table[top + rows, left + cols] - table[top, left + cols] -
+                   table[top + rows, left] + table[top, left])
+
+    def window_mean(self, center, radius):
+        """
+        :return: The mean value of the square window of the given radius around center
+        """
+        rows, cols = self._extents(radius)
+        return self.window_sum(center, radius) / (rows * cols)
+
+    def window_sums(self, radius):
+        """
+        Sum the square window of the given radius around every cell at once.
+        :param radius: The half size of the windows
+        :return: A (height, width) int64 array of window sums, indexed by window center
+        """
+        table = self.table
+        rows, cols = self._extents(radius)
+        top = ((np.arange(self.height) - radius) % self.height)[:, None]
+        left = ((np.arange(self.width) - radius) % self.width)[None, :]
+        return (table[top + rows, left + cols] - table[top, left + cols] -
+                table[top + rows, left] + table[top, left])
+
+    def window_means(self, radius):
+        """
+        :return: A (height, width) float array of the mean of the window of the given radius around every cell
+        """
+        rows, cols = self._extents(radius)
+        return self.window_sums(radius) / (rows * cols)
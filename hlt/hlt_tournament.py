@@ -0,0 +1,299 @@
+"""
+A self-play tournament runner: plays bot configurations against each other across map sizes, player
+counts and seeds on a process pool, streams one JSON line per game into a results file and summarizes
+win rates with confidence intervals.
+
+Games run on the in-process engine of hlt_engine by default, or on an external engine command speaking
+the official command line, such as ./halite. Run it as:
+
+    python -m hlt.hlt_tournament MyBot.py MyBot.py:FULL=800,EMPTY=30 --seeds 20 --results results.jsonl
+"""
+import argparse
+import collections
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+
+from hlt.hlt_engine import ScriptBot, run_game
+from hlt.hlt_turn_budget import DEFAULT_TURN_TIME_LIMIT
+
+"""Map sizes of the official games."""
+MAP_SIZES = (32, 40, 48, 56, 64)
+
+"""The 95% two-sided normal quantile, for the win rate confidence intervals."""
+CONFIDENCE_Z = 1.96
+
+
+class BotConfig:
+    """
+    A bot script with the tuning constants it plays with.
+    """
+    def __init__(self, path, settings=None, name=None):
+        """
+        :param path: The path of the bot script, made absolute as workers play from the log directory
+        :param settings: A dict of tuning constants overriding the script's own, see ScriptBot
+        :param name: The name of the configuration in the results, by default its spec
+        """
+        self.path = os.path.abspath(path)
+        self.settings = dict(settings or {})
+        self.name = name or self.spec()
+
+    @staticmethod
+    def parse(spec):
+        """
+        :param spec: A "path" or "path:KEY=VALUE,KEY=VALUE" string, values being JSON
+        :return: The BotConfig it describes
+        """
+        path, _, assignments = spec.partition(":")
+        settings = {}
+        for assignment in filter(None, assignments.split(",")):
+            key, _, value = assignment.partition("=")
+            try:
+                settings[key] = json.loads(value)
+            except ValueError:
+                settings[key] = value
+        return BotConfig(path, settings)
+
+    def spec(self):
+        if not self.settings:
+            return self.path
+        return "{}:{}".format(self.path, ",".join("{}={}".format(key, json.dumps(value))
+                                                  for key, value in sorted(self.settings.items())))
+
+    def command(self):
+        """
+        :return: The shell command running this configuration as its own process
+        """
+        command = "{} {}".format(shlex.quote(sys.executable), shlex.quote(self.path))
+        if self.settings:
+            command = "env BOT_SETTINGS={} {}".format(shlex.quote(json.dumps(self.settings)), command)
+        return command
+
+
+def schedule(configs, sizes=MAP_SIZES, player_counts=(2, 4), seeds=range(10)):
+    """
+    List the games of a tournament. Two player games pit every pair of configurations in both seatings;
+    four player games seat every rotation of the configurations, repeated to fill the table.
+    :param configs: The list of BotConfig
+    :param sizes: The map sizes, maps being square
+    :param player_counts: The player counts, 2 and/or 4
+    :param seeds: The map seeds
+    :return: A list of game dicts with size, seed and the indices of the configurations in seat order
+    """
+    games = []
+    for size, player_count, seed in itertools.product(sizes, player_counts, seeds):
+        if player_count == 2 and len(configs) > 1:
+            lineups = itertools.permutations(range(len(configs)), 2)
+        else:
+            lineups = ([(start + seat) % len(configs) for seat in range(player_count)]
+                       for start in range(len(configs)))
+        for lineup in lineups:
+            games.append({"size": size, "seed": seed, "lineup": list(lineup)})
+    return games
+
+
+def _game_key(game, configs):
+    return (game["size"], game["seed"], tuple(configs[index].name for index in game["lineup"]))
+
+
+def _result_key(result):
+    return result["size"], result["seed"], tuple(player["config"] for player in result["players"])
+
+
+def _timing(times):
+    """
+    :return: The mean, 95th percentile and max of per turn answer times, in milliseconds
+    """
+    if not times:
+        return {}
+    ordered = sorted(times)
+    return {"time_mean": round(1000 * sum(ordered) / len(ordered), 3),
+            "time_p95": round(1000 * ordered[int(0.95 * (len(ordered) - 1))], 3),
+            "time_max": round(1000 * ordered[-1], 3)}
+
+
+def _play_in_process(configs, size, seed, timeout):
+    bots = [ScriptBot(config.path, timeout=timeout, settings=config.settings) for config in configs]
+    game = run_game(bots, width=size, height=size, seed=seed)
+    players = []
+    for config, result in zip(configs, game["players"]):
+        player = {"config": config.name, "halite": result["halite"], "ships_built": result["ships_built"],
+                  "rank": result["rank"]}
+        if result["error"] is not None:
+            player["error"] = result["error"]
+        player.update(_timing(result["turn_times"]))
+        players.append(player)
+    # A bot out of the game loses it: seats are ranked by halite, those with an error after all the others
+    for rank, player in enumerate(sorted(players, key=lambda player: ("error" in player, -player["halite"])), 1):
+        player["rank"] = rank
+    return game["turns"], players
+
+
+def _play_external(configs, size, seed, engine_command):
+    command = shlex.split(engine_command) + ["--results-as-json", "--no-replay", "--no-logs",
+                                             "--width", str(size), "--height", str(size), "-s", str(seed)]
+    output = subprocess.run(command + [config.command() for config in configs],
+                            check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    stats = json.loads(output)["stats"]
+    players = [{"config": config.name, "halite": stats[str(index)]["score"], "ships_built": None,
+                "rank": stats[str(index)]["rank"]}
+               for index, config in enumerate(configs)]
+    return None, players
+
+
+def play(task):
+    """
+    Play one game of a tournament, in a pool worker.
+    :param task: A (configs, game, engine_command, timeout) tuple, configs being in seat order
+    :return: The result dict written to the results file
+    """
+    configs, game, engine_command, timeout = task
+    if engine_command:
+        turns, players = _play_external(configs, game["size"], game["seed"], engine_command)
+    else:
+        turns, players = _play_in_process(configs, game["size"], game["seed"], timeout)
+    return {"size": game["size"], "seed": game["seed"], "turns": turns, "players": players}
+
+
+def _init_worker(log_directory):
+    # Bots log to bot-<id>.log in the working directory
+    os.chdir(log_directory)
+
+
+def load_results(path):
+    """
+    :return: The list of game results stored in a results file, empty if there is none
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as results_file:
+        return [json.loads(line) for line in results_file if line.strip()]
+
+
+def run_tournament(configs, games, results_path, processes=None, engine_command=None,
+                   timeout=DEFAULT_TURN_TIME_LIMIT, log_directory=None):
+    """
+    Play the games not already in the results file, appending each result as soon as it is known.
+    :param configs: The list of BotConfig
+    :param games: The games to play, as returned by schedule
+    :param results_path: The JSON lines results file
+    :param processes: The number of worker processes, every core by default
+    :param engine_command: An external engine command, None for the in-process engine
+    :param timeout: Seconds an in-process bot gets per turn before it is out of the game, None to wait forever
+    :param log_directory: The working directory of the workers, where bots write their logs
+    :return: Every result in the results file
+    """
+    if engine_command:
+        # Workers play from the log directory
+        engine = shlex.split(engine_command)
+        if os.path.exists(engine[0]):
+            engine[0] = os.path.abspath(engine[0])
+        engine_command = " ".join(shlex.quote(part) for part in engine)
+
+    results = load_results(results_path)
+    done = collections.Counter(_result_key(result) for result in results)
+    tasks = []
+    for game in games:
+        key = _game_key(game, configs)
+        if done[key]:
+            done[key] -= 1
+            continue
+        tasks.append(([configs[index] for index in game["lineup"]], game, engine_command, timeout))
+
+    log_directory = log_directory or tempfile.mkdtemp(prefix="halite-tournament-")
+    with open(results_path, "a") as results_file, \
+            multiprocessing.Pool(processes, _init_worker, (log_directory,)) as pool:
+        for result in pool.imap_unordered(play, tasks):
+            results_file.write(json.dumps(result, separators=(",", ":")) + "\n")
+            results_file.flush()
+            results.append(result)
+    return results
+
+
+def wilson_interval(wins, games, z=CONFIDENCE_Z):
+    """
+    :return: The (low, high) Wilson score interval of a win rate
+    """
+    if games == 0:
+        return 0.0, 1.0
+    rate = wins / games
+    denominator = 1 + z * z / games
+    center = (rate + z * z / (2 * games)) / denominator
+    spread = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, center - spread), min(1.0, center + spread)
+
+
+def summarize(results):
+    """
+    Aggregate game results per configuration and player count. A win is a first rank.
+
+    Four player games may seat a configuration more than once; its seats are not independent trials, so a
+    configuration counts once per game, by its best placed seat.
+    :return: A dict mapping (config name, player count) to games, wins, win_rate, its 95% interval
+        (win_low, win_high), mean_halite and mean_rank
+    """
+    totals = collections.defaultdict(lambda: {"games": 0, "wins": 0, "halite": 0, "rank": 0})
+    for result in results:
+        best_seats = {}
+        for player in result["players"]:
+            best = best_seats.get(player["config"])
+            if best is None or player["rank"] < best["rank"]:
+                best_seats[player["config"]] = player
+        for player in best_seats.values():
+            total = totals[(player["config"], len(result["players"]))]
+            total["games"] += 1
+            total["wins"] += player["rank"] == 1
+            total["halite"] += player["halite"]
+            total["rank"] += player["rank"]
+
+    summary = {}
+    for key, total in totals.items():
+        games = total["games"]
+        low, high = wilson_interval(total["wins"], games)
+        summary[key] = {"games": games, "wins": total["wins"], "win_rate": total["wins"] / games,
+                        "win_low": low, "win_high": high, "mean_halite": total["halite"] / games,
+                        "mean_rank": total["rank"] / games}
+    return summary
+
+
+def format_summary(summary):
+    """
+    :return: The summary as a text table, one line per configuration and player count
+    """
+    lines = ["{:<40} {:>7} {:>6} {:>18} {:>10} {:>5}".format("config", "players", "games", "win rate (95%)",
+                                                              "halite", "rank")]
+    for (name, player_count), row in sorted(summary.items(), key=lambda item: (item[0][1], item[0][0])):
+        win_rate = "{:.1%} [{:.0%}-{:.0%}]".format(row["win_rate"], row["win_low"], row["win_high"])
+        lines.append("{:<40} {:>7} {:>6} {:>18} {:>10.0f} {:>5.2f}".format(
+            name, player_count, row["games"], win_rate, row["mean_halite"], row["mean_rank"]))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a self-play tournament between bot configurations.")
+    parser.add_argument("configs", nargs="+", help='Bot configurations, as "path" or "path:KEY=VALUE,..."')
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(MAP_SIZES))
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 4], choices=[2, 4])
+    parser.add_argument("--seeds", type=int, default=10, help="Number of map seeds per size and player count")
+    parser.add_argument("--results", default="tournament.jsonl", help="JSON lines results file, resumed if present")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--engine", default=None, help="External engine command, such as ./halite")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TURN_TIME_LIMIT,
+                        help="Seconds per turn for in-process bots, after which a bot is out of the game")
+    parser.add_argument("--logs", default=None, help="Directory for bot logs")
+    args = parser.parse_args(argv)
+
+    configs = [BotConfig.parse(spec) for spec in args.configs]
+    games = schedule(configs, args.sizes, args.players, range(args.seeds))
+    results = run_tournament(configs, games, args.results, args.processes, args.engine, args.timeout, args.logs)
+    print(format_summary(summarize(results)))
+
+
+if __name__ == "__main__":
+    main()
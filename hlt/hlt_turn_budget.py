@@ -0,0 +1,94 @@
+import logging
+import time
+
+"""Time, in seconds, the engine gives a bot to answer a turn."""
+DEFAULT_TURN_TIME_LIMIT = 2.0
+
+"""Time, in seconds, kept in reserve to send the commands."""
+DEFAULT_SAFETY_MARGIN = 0.25
+
+
+class TurnBudget:
+    """
+    Clock of the current turn, started by Game.update_frame as soon as the first line of the engine's frame
+    arrives, so reading and decoding the rest of the frame count against the limit.
+    """
+    def __init__(self, limit=DEFAULT_TURN_TIME_LIMIT, margin=DEFAULT_SAFETY_MARGIN):
+        """
+        :param limit: The engine's per turn time limit, in seconds
+        :param margin: The time kept in reserve to send the commands, in seconds
+        """
+        self.limit = limit
+        self.margin = margin
+        self._started = time.perf_counter()
+
+    def start(self):
+        """
+        Restart the clock for a new turn.
+        """
+        self._started = time.perf_counter()
+
+    def elapsed(self):
+        """
+        :return: The time spent on this turn so far, in seconds
+        """
+        return time.perf_counter() - self._started
+
+    def remaining(self):
+        """
+        :return: The time left before the commands must be sent, in seconds (negative once overdue)
+        """
+        return self.limit - self.margin - self.elapsed()
+
+    def expired(self):
+        """
+        :return: Whether the commands must be sent now
+        """
+        return self.remaining() <= 0
+
+
+class AnytimePlanner:
+    """
+    Runs planning steps in order, keeping the best result so far, until the turn budget runs out.
+
+    The first step should be cheap and always produce a safe result; later steps refine it. Each step is
+    called as step(best, budget) and returns an improved result, or None to keep the current one. Long
+    steps should check budget.remaining() themselves. A step is skipped when its last run took longer than
+    the time left, so the planner persists across turns to learn these durations.
+    """
+    def __init__(self, budget):
+        """
+        :param budget: The TurnBudget of the game
+        """
+        self.budget = budget
+        self._steps = []
+        self._durations = {}
+
+    def add_step(self, name, step):
+        """
+        Register a planning step, run after the ones already registered.
+        :param name: The name of the step, used to track its duration
+        :param step: A callable taking (best, budget) and returning a result or None
+        """
+        self._steps.append((name, step))
+
+    def run(self, initial=None):
+        """
+        Run the steps of this turn.
+        :param initial: The result to start from
+        :return: The best result produced in time
+        """
+        best = initial
+        for index, (name, step) in enumerate(self._steps):
+            # The first step always runs, so there is a result to send
+            if index > 0 and best is not None and self._durations.get(name, 0) >= self.budget.remaining():
+                logging.debug("Skipping planning step %s with %.3fs left", name, self.budget.remaining())
+                continue
+            started = time.perf_counter()
+            result = step(best, self.budget)
+            self._durations[name] = time.perf_counter() - started
+            if result is not None:
+                best = result
+            if self.budget.expired():
+                break
+        return best
@@ -0,0 +1,46 @@
+import functools
+
+
+class TurnCache:
+    """
+    Values computed at most once per turn: the owner clears the cache when a new frame arrives.
+    Counts its hits and misses, to check that the values are actually reused.
+    """
+    def __init__(self):
+        self._values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute, *args):
+        """
+        :param key: The key of the value
+        :param compute: The function computing the value on a miss, called with args
+        :return: The value of the current turn
+        """
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            value = self._values[key] = compute(*args)
+            return value
+        self.hits += 1
+        return value
+
+    def clear(self):
+        """
+        Drop the values of the previous turn.
+        """
+        self._values.clear()
+
+
+def turn_cached(method):
+    """
+    Decorate a method without arguments of an object with a TurnCache in its _cache attribute, so the method
+    runs once per turn. The value is shared by every caller: return read-only values, such as tuples.
+    """
+    key = method.__name__
+
+    @functools.wraps(method)
+    def cached(self):
+        return self._cache.get(key, method, self)
+    return cached
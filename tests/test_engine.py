@@ -0,0 +1,147 @@
+import textwrap
+
+from hlt.hlt_engine import FunctionBot, HaliteEngine, ScriptBot, run_game
+from hlt.hlt_positionals import Direction, PositionPool, active_pool
+
+
+def _script(tmp_path, body):
+    path = tmp_path / "bot.py"
+    path.write_text(textwrap.dedent(body))
+    return str(path)
+
+
+BOT = """
+    import time
+    from hlt.hlt_networking import Game
+    from hlt.hlt_positionals import Position
+    game = Game(log_mode="off")
+    game.ready("bot")
+    while True:
+        game.update_frame()
+        {turn}
+        game.end_turn([])
+"""
+
+
+def test_crashing_bot_is_out_of_the_game(tmp_path):
+    path = _script(tmp_path, BOT.format(turn="if game.turn_number == 2: raise ValueError('boom')"))
+    game = run_game([ScriptBot(path), FunctionBot(lambda game: [])], 32, 32, game_constants={"MAX_TURNS": 5})
+    assert game["turns"] == 5
+    assert "boom" in game["players"][0]["error"]
+    assert game["players"][1]["error"] is None
+
+
+def test_late_bot_is_out_of_the_game(tmp_path):
+    path = _script(tmp_path, BOT.format(turn="if game.turn_number == 3: time.sleep(0.5)"))
+    game = run_game([ScriptBot(path, timeout=0.2), FunctionBot(lambda game: [])], 32, 32,
+                    game_constants={"MAX_TURNS": 6})
+    late = game["players"][0]
+    assert late["error"] == "no answer within 0.2s"
+    # The late bot is no longer waited for
+    assert max(late["turn_times"][3:]) < 0.1
+
+
+def test_script_bots_intern_positions_on_their_own_map(tmp_path):
+    path = _script(tmp_path, BOT.format(turn="assert Position(32, 0) is game.game_map.normalize(Position(0, 0))"))
+    positions = PositionPool(40, 40)
+    positions.activate()
+    game = run_game([ScriptBot(path), ScriptBot(path)], 32, 32, game_constants={"MAX_TURNS": 3})
+    assert [player["error"] for player in game["players"]] == [None, None]
+    assert active_pool() is positions
+
+
+def _engine(cells=()):
+    """
+    :param cells: (x, y, halite) of the cells to set, every other cell being empty
+    :return: A two player 32x32 engine, shipyards at (8, 16) and (23, 16)
+    """
+    engine = HaliteEngine(2, 32, 32)
+    engine.halite = [[0] * 32 for _ in range(32)]
+    for x, y, halite in cells:
+        engine.halite[y][x] = halite
+    return engine
+
+
+def _play(engine, policies, turns=1):
+    """
+    Play turns of an engine with a FunctionBot per player.
+    :return: The FunctionBots, updated with the frame following the last turn
+    """
+    bots = [FunctionBot(policy) for policy in policies]
+    for player_id, bot in enumerate(bots):
+        bot.start(engine.initial_input(player_id))
+    for _ in range(turns):
+        frame = engine.frame_input()
+        engine.step([bot.play(frame) for bot in bots])
+    frame = engine.frame_input()
+    for bot in bots:
+        bot.play(frame)
+    return bots
+
+
+def _idle(game):
+    return []
+
+
+def _move(direction):
+    return lambda game: [ship.move(direction) for ship in game.me.get_ships()]
+
+
+def test_still_ship_extracts_a_quarter_of_its_cell():
+    engine = _engine([(3, 3, 400)])
+    engine.add_ship(0, 3, 3)
+    bot, _ = _play(engine, [_idle, _idle])
+    assert bot.game.me.get_ship(0).halite_amount == 100
+    assert bot.game.game_map.halite_array[3, 3] == 300
+
+
+def test_moving_burns_a_tenth_of_the_cell_left():
+    engine = _engine([(3, 3, 400)])
+    engine.add_ship(0, 3, 3, halite=100)
+    engine.add_ship(0, 3, 5, halite=30)
+    engine.halite[5][3] = 400
+    bot, _ = _play(engine, [_move(Direction.East), _idle])
+    moved, stuck = bot.game.me.get_ship(0), bot.game.me.get_ship(1)
+    assert (moved.position.x, moved.position.y, moved.halite_amount) == (4, 3, 60)
+    # Short of the 40 halite the move costs, the ship stays
+    assert (stuck.position.x, stuck.position.y) == (3, 5)
+
+
+def test_colliding_ships_drop_their_cargo():
+    engine = _engine()
+    engine.add_ship(0, 3, 3, halite=200)
+    engine.add_ship(1, 5, 3, halite=300)
+    bot, _ = _play(engine, [_move(Direction.East), _move(Direction.West)])
+    assert bot.game.me.get_ships() == () and bot.game.players[1].get_ships() == ()
+    assert bot.game.game_map.halite_array[3, 4] == 500
+
+
+def test_ship_deposits_on_its_shipyard():
+    engine = _engine()
+    engine.add_ship(0, 7, 16, halite=600)
+    bot, _ = _play(engine, [_move(Direction.East), _idle])
+    assert bot.game.me.halite_amount == 5600
+    assert bot.game.me.get_ship(0).halite_amount == 0
+
+
+def test_ship_converts_into_a_dropoff():
+    engine = _engine([(3, 3, 300)])
+    engine.add_ship(0, 3, 3, halite=500)
+    bot, _ = _play(engine, [lambda game: [ship.make_dropoff() for ship in game.me.get_ships()], _idle])
+    # The ship's cargo and its cell's halite pay for part of the 4000 cost
+    assert bot.game.me.halite_amount == 5000 - 3200
+    assert bot.game.me.get_ships() == ()
+    assert [(dropoff.position.x, dropoff.position.y) for dropoff in bot.game.me.get_dropoffs()] == [(3, 3)]
+    assert bot.game.game_map.halite_array[3, 3] == 0
+
+
+def test_inspired_ship_gets_the_bonus():
+    engine = _engine([(3, 3, 400), (3, 10, 400)])
+    engine.add_ship(0, 3, 3)
+    engine.add_ship(0, 3, 10)
+    # Two enemy ships within 4 cells of the first ship only
+    engine.add_ship(1, 5, 3)
+    engine.add_ship(1, 3, 1)
+    bot, _ = _play(engine, [_idle, _idle])
+    assert bot.game.me.get_ship(0).halite_amount == 100 + 200
+    assert bot.game.me.get_ship(1).halite_amount == 100
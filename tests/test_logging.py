@@ -0,0 +1,49 @@
+import logging
+import threading
+
+import pytest
+
+from hlt.hlt_logging import LEVEL_ENVIRONMENT_VARIABLE, setup_logging
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    """
+    The root logger, bots logging into tmp_path. Tests start with _clear, as pytest adds its handlers to
+    the root logger around each test.
+    """
+    monkeypatch.chdir(tmp_path)
+    root = logging.getLogger()
+    monkeypatch.setattr(root, "level", root.level)
+    yield root
+
+
+def _clear(root, monkeypatch):
+    monkeypatch.setattr(root, "handlers", [])
+
+
+def test_numeric_level_from_the_environment(root, monkeypatch):
+    _clear(root, monkeypatch)
+    monkeypatch.setenv(LEVEL_ENVIRONMENT_VARIABLE, "20")
+    setup_logging(0)
+    logging.debug("hidden")
+    logging.info("shown")
+    root.handlers[0].close()
+    log = open("bot-0.log").read()
+    assert "shown" in log and "hidden" not in log
+
+
+def test_bots_on_their_own_threads_log_to_their_own_files(root, monkeypatch):
+    _clear(root, monkeypatch)
+
+    def bot(player_id, mode):
+        setup_logging(player_id, mode=mode, every=2 if player_id == 1 else None)
+        logging.info("bot %d", player_id)
+    for player_id, mode in enumerate(["sync", "async", "off"]):
+        thread = threading.Thread(target=bot, args=(player_id, mode))
+        thread.start()
+        thread.join()
+    root.handlers[0].close()
+    assert "bot 0" in open("bot-0.log").read()
+    assert open("bot-1.log").read().count("bot") == 1 and "bot 1" in open("bot-1.log").read()
+    assert root.level == logging.DEBUG
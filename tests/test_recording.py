@@ -0,0 +1,38 @@
+import textwrap
+
+from hlt.hlt_engine import FunctionBot, run_game
+from hlt.hlt_recording import RECORD_ENVIRONMENT_VARIABLE, Recording, replay
+
+POLICY = """
+    def policy(game):
+        if game.turn_number <= 2:
+            return ["g"]
+        return ["m {} {}".format(ship.id, "nsew"[(ship.id + game.turn_number) % 4]) for ship in game.me.get_ships()]
+"""
+
+
+def test_function_bot_recording_replays(tmp_path, monkeypatch):
+    namespace = {}
+    exec(textwrap.dedent(POLICY), namespace)
+    sent = []
+
+    def recorded_policy(game):
+        commands = namespace["policy"](game)
+        sent.append((game.turn_number, " ".join(commands)))
+        return commands
+    monkeypatch.setenv(RECORD_ENVIRONMENT_VARIABLE, str(tmp_path / "bot-{id}.hlr"))
+    run_game([FunctionBot(recorded_policy), FunctionBot(lambda game: [])], 32, 32,
+             game_constants={"MAX_TURNS": 10})
+    monkeypatch.delenv(RECORD_ENVIRONMENT_VARIABLE)
+
+    script = tmp_path / "bot.py"
+    script.write_text(textwrap.dedent(POLICY) + textwrap.dedent("""
+        from hlt.hlt_networking import Game
+        game = Game(log_mode="off")
+        game.ready("bot")
+        while True:
+            game.update_frame()
+            game.end_turn(policy(game))
+    """))
+    recording = Recording.load(str(tmp_path / "bot-0.hlr"))
+    assert [(turn, line) for turn, line, _ in replay(recording, str(script))] == sent
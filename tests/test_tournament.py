@@ -0,0 +1,38 @@
+import textwrap
+
+from hlt.hlt_tournament import BotConfig, play, summarize
+
+
+def test_config_name_does_not_depend_on_the_working_directory(tmp_path, monkeypatch):
+    (tmp_path / "bots").mkdir()
+    monkeypatch.chdir(tmp_path)
+    relative = BotConfig.parse("bots/bot.py:FULL=800")
+    monkeypatch.chdir(tmp_path / "bots")
+    assert BotConfig.parse("bot.py:FULL=800").name == relative.name
+
+
+def test_config_counts_once_per_game():
+    players = [{"config": "a", "halite": 10, "rank": 1}, {"config": "b", "halite": 8, "rank": 2},
+               {"config": "a", "halite": 5, "rank": 3}, {"config": "b", "halite": 1, "rank": 4}]
+    summary = summarize([{"players": players}])
+    assert summary[("a", 4)]["games"] == 1 and summary[("a", 4)]["wins"] == 1
+    assert summary[("b", 4)]["games"] == 1 and summary[("b", 4)]["mean_rank"] == 2
+
+
+def test_crashing_config_loses(tmp_path):
+    script = tmp_path / "bot.py"
+    script.write_text(textwrap.dedent("""
+        from hlt.hlt_networking import Game
+        game = Game(log_mode="off")
+        game.ready("bot")
+        while True:
+            game.update_frame()
+            if BOT_SETTINGS["CRASH"] and game.turn_number == 2:
+                raise ValueError("boom")
+            game.end_turn(["g"] if game.turn_number == 1 else [])
+    """))
+    configs = [BotConfig(str(script), {"CRASH": False}), BotConfig(str(script), {"CRASH": True})]
+    result = play((configs[::-1], {"size": 32, "seed": 0}, None, 1.0))
+    crashed, healthy = result["players"]
+    assert "boom" in crashed["error"] and crashed["rank"] == 2
+    assert "error" not in healthy and healthy["rank"] == 1